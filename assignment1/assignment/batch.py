@@ -0,0 +1,195 @@
+import argparse
+import collections
+import concurrent.futures
+import os
+import pathlib
+import time
+
+from .colour import grey2rgb, rgb2grey
+from .io import imread, imwrite
+
+# File extensions that are recognized as NetPBM images.
+_EXTENSIONS = {'.pgm', '.ppm', '.pnm'}
+
+# The conversions that are available from the command line.
+_OPERATIONS = {
+    'rgb2grey': rgb2grey,
+    'grey2rgb': grey2rgb
+}
+
+
+class ConversionSummary:
+    '''Outcome of converting a directory of images.
+
+    Attributes
+    ----------
+    converted : list of pathlib.Path
+        output files that were successfully written
+    failures : list of ``(pathlib.Path, str)``
+        input files that couldn't be converted, along with the reason why
+    nbytes : int
+        total size, in bytes, of the successfully converted input files
+    elapsed : float
+        wall-clock time, in seconds, taken by the conversion
+    '''
+    def __init__(self):
+        self.converted = []
+        self.failures = []
+        self.nbytes = 0
+        self.elapsed = 0.0
+
+    @property
+    def images_per_second(self):
+        '''float : number of images converted per second'''
+        return len(self.converted) / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def megabytes_per_second(self):
+        '''float : amount of input data, in MB, converted per second'''
+        return self.nbytes / 1e6 / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self):
+        return (f'Converted {len(self.converted)} images ({len(self.failures)} failed) in '
+                f'{self.elapsed:.2f}s: {self.images_per_second:.1f} images/s, '
+                f'{self.megabytes_per_second:.1f} MB/s')
+
+
+def _convert_file(task):
+    '''Convert a single file; runs inside a worker process.
+
+    Parameters
+    ----------
+    task : ``(src, dst, op, binary)``
+        the input file, the output file without an extension, the
+        conversion function and whether to save a binary image
+
+    Returns
+    -------
+    src : pathlib.Path
+        the input file
+    output : pathlib.Path or None
+        the output file, or ``None`` if the conversion failed
+    nbytes : int
+        size of the input file
+    error : str or None
+        the reason for the failure, or ``None`` on success
+    '''
+    src, dst, op, binary = task
+    try:
+        image = op(imread(src))
+        output = dst.with_suffix('.pgm' if image.ndim == 2 else '.ppm')
+        imwrite(output, image, binary)
+        return src, output, src.stat().st_size, None
+    except Exception as e:
+        return src, None, 0, f'{type(e).__name__}: {e}'
+
+
+def _collect(summary, results):
+    '''Gather the per-file results into the summary.'''
+    for src, output, nbytes, error in results:
+        if error is None:
+            summary.converted.append(output)
+            summary.nbytes += nbytes
+        else:
+            summary.failures.append((src, error))
+
+
+def convert_directory(src, dst, op=rgb2grey, workers=None, chunksize=None, binary=True):
+    '''Convert every NetPBM image in a directory.
+
+    Each file is read, passed through ``op`` and written out by a pool of
+    worker processes.  A file that fails to convert is recorded in the
+    returned summary rather than stopping the rest of the batch.  Outputs are
+    named after the inputs, so files that only differ by their extension,
+    e.g. ``a.pgm`` and ``a.ppm``, are all recorded as failures rather than
+    overwriting each other.
+
+    Parameters
+    ----------
+    src : path-like object
+        folder containing the ``.pgm``, ``.ppm`` or ``.pnm`` input files
+    dst : path-like object
+        folder where the converted images are saved; it is created if it
+        doesn't already exist
+    op : callable, optional
+        a picklable, module-level function that maps one image array onto
+        another; defaults to ``rgb2grey()``
+    workers : int, optional
+        number of worker processes; defaults to the number of CPUs
+    chunksize : int, optional
+        number of files handed to a worker at a time; by default the files are
+        split into roughly four chunks per worker
+    binary : bool, optional
+        if ``True`` (the default), save binary (P5/P6) images, which are much
+        faster to write; otherwise save plain text (P2/P3)
+
+    Returns
+    -------
+    ConversionSummary
+        the converted files, any failures and the overall throughput
+
+    Raises
+    ------
+    ValueError
+        if ``src`` isn't a directory or if ``workers`` is less than one
+    '''
+    src = pathlib.Path(src)
+    dst = pathlib.Path(dst)
+    if not src.is_dir():
+        raise ValueError(f'"{src}" is not a directory.')
+
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers < 1:
+        raise ValueError('Need at least one worker.')
+
+    files = sorted(f for f in src.iterdir() if f.suffix.lower() in _EXTENSIONS)
+    stems = collections.Counter(f.stem for f in files)
+    tasks = [(f, dst / f.stem, op, binary) for f in files if stems[f.stem] == 1]
+    if chunksize is None:
+        chunksize = max(1, len(tasks) // (4 * workers))
+
+    dst.mkdir(parents=True, exist_ok=True)
+    summary = ConversionSummary()
+    start = time.perf_counter()
+
+    for f in files:
+        if stems[f.stem] > 1:
+            summary.failures.append(
+                (f, f'ValueError: another input file is also named "{f.stem}".'))
+
+    if workers == 1:
+        _collect(summary, map(_convert_file, tasks))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            _collect(summary, executor.map(_convert_file, tasks, chunksize=chunksize))
+
+    summary.elapsed = time.perf_counter() - start
+    return summary
+
+
+def main(args=None):
+    '''Command-line entry point; returns a non-zero exit code on any failure.'''
+    parser = argparse.ArgumentParser(
+        description='Convert a directory of NetPBM images between colour and greyscale.')
+    parser.add_argument('src', help='input folder')
+    parser.add_argument('dst', help='output folder')
+    parser.add_argument('--op', choices=list(_OPERATIONS), default='rgb2grey',
+                        help='conversion to apply (default: rgb2grey)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of worker processes (default: number of CPUs)')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='number of files sent to a worker at a time')
+    parser.add_argument('--text', dest='binary', action='store_false',
+                        help='save plain-text (P2/P3) rather than binary (P5/P6) images')
+    args = parser.parse_args(args)
+
+    summary = convert_directory(args.src, args.dst, _OPERATIONS[args.op], args.workers,
+                                args.chunksize, args.binary)
+    for src, error in summary.failures:
+        print(f'{src}: {error}')
+    print(summary)
+    return 1 if summary.failures else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,7 +1,96 @@
 import numpy as np
 
+# The fixed-point path works on bands of about this many pixels at a time so
+# that its temporaries stay small.
+_BAND_PIXELS = 1 << 16
 
-def rgb2grey(image):
+
+def _check_depth(image):
+    '''Ensure the image is 8 or 16bpc and return its native-endian data type.'''
+    if image.dtype.kind != 'u' or image.dtype.itemsize not in (1, 2):
+        raise ValueError('Can only support 8-bit or 16-bit images.')
+    return image.dtype.newbyteorder('=')
+
+
+def _check_out(out, shape, dtype):
+    '''Validate a caller-supplied output buffer.'''
+    if out.shape != shape or out.dtype != dtype:
+        raise ValueError(f'Output must be a {shape} {dtype} array, not {out.shape} {out.dtype}.')
+
+
+def _rgb2grey_float(image, out):
+    '''Floating-point conversion, exactly as described in ``rgb2grey()``.'''
+    scale = np.iinfo(image.dtype).max
+    image = image / scale
+    grey = 0.299*image[:, :, 0] + 0.587*image[:, :, 1] + 0.114*image[:, :, 2]
+    grey *= scale
+    np.copyto(out, grey, casting='unsafe')
+    return out
+
+
+def _rounding_exceptions():
+    '''Find the RGB values where the fixed-point and float conversions differ.
+
+    In fixed point the greyscale value is ``(299R + 587G + 114B) // 1000``,
+    which is the exact floor of the weighted sum.  The floating-point result
+    can only differ from that when the weighted sum is a whole number and the
+    rounding error lands just below it, so only those colours are checked.
+    They're found by solving ``114B = -(299R + 587G) (mod 1000)`` for every
+    ``(R, G)`` pair, and then run through the float conversion itself.
+
+    Returns
+    -------
+    numpy.ndarray
+        sorted ``R << 16 | G << 8 | B`` keys of the colours whose float result
+        is one less than the fixed-point result
+    '''
+    r, g = np.divmod(np.arange(1 << 16, dtype=np.int64), 256)
+    residue = -(299*r + 587*g) % 1000
+    # 114B = residue (mod 1000) <=> 57B = residue / 2 (mod 500), with 57 * 193 = 1 (mod 500).
+    b = (residue // 2 * 193) % 500
+    valid = (residue % 2 == 0) & (b < 256)
+    rgb = np.stack((r[valid], g[valid], b[valid]), axis=-1).astype(np.uint8)
+
+    candidates = rgb[:, np.newaxis, :]
+    expected = (299*r[valid] + 587*g[valid] + 114*b[valid]) // 1000
+    actual = _rgb2grey_float(candidates, np.empty(candidates.shape[:2], dtype=np.uint8))
+
+    rgb = rgb[actual[:, 0] != expected].astype(np.uint32)
+    return np.sort(rgb[:, 0] << 16 | rgb[:, 1] << 8 | rgb[:, 2])
+
+
+_ROUNDING_EXCEPTIONS = _rounding_exceptions()
+
+
+def _rgb2grey_fixed(image, out):
+    '''Integer conversion; bit-exact with ``_rgb2grey_float()`` for 8-bit images.
+
+    For 16-bit images the result is the exact floor of the weighted sum, which
+    may be one more than the floating-point result in rare cases.
+    '''
+    rows = max(1, _BAND_PIXELS // max(1, image.shape[1]))
+    for start in range(0, image.shape[0], rows):
+        band = image[start:start + rows]
+        total = np.multiply(band[:, :, 0], 299, dtype=np.uint32)
+        total += np.multiply(band[:, :, 1], 587, dtype=np.uint32)
+        total += np.multiply(band[:, :, 2], 114, dtype=np.uint32)
+        grey, remainder = np.divmod(total, 1000)
+
+        # Apply the float path's rounding to the sums that are whole numbers.
+        y, x = np.nonzero(remainder == 0)
+        if y.size > 0 and image.dtype == np.uint8:
+            pixels = band[y, x].astype(np.uint32)
+            keys = pixels[:, 0] << 16 | pixels[:, 1] << 8 | pixels[:, 2]
+            index = np.searchsorted(_ROUNDING_EXCEPTIONS, keys)
+            index[index == _ROUNDING_EXCEPTIONS.size] = 0
+            hit = _ROUNDING_EXCEPTIONS[index] == keys
+            grey[y[hit], x[hit]] -= 1
+
+        np.copyto(out[start:start + rows], grey, casting='unsafe')
+    return out
+
+
+def rgb2grey(image, out=None, fixed_point=True):
     '''Convert a RGB colour image into a greyscale image.
 
     The image is converted into RGB by taking a weighted sum of the three colour
@@ -15,25 +104,50 @@ def rgb2grey(image):
     that it's on [0, 1].  After generating the greyscale image, it should be
     converted back to 8bpc.
 
+    By default the same result is computed with integer arithmetic instead,
+    which avoids the full-size floating-point temporaries.  A table of the few
+    colours where floating-point rounding lands below a whole number keeps the
+    two bit-for-bit identical for 8-bit images.  16-bit images are converted
+    the same way, producing a 16-bit result.
+
     Parameters
     ----------
     image : numpy.ndarray
         a 3-channel, RGB image
+    out : numpy.ndarray, optional
+        a ``H x W`` array, with the same bit depth as the image, that the
+        result is written into
+    fixed_point : bool, optional
+        use the integer implementation (the default) rather than computing the
+        weighted sum in floating point
 
     Returns
     -------
     numpy.ndarray
-        a single channel, monochome image derived from the original
+        a single channel, monochome image derived from the original; this is
+        ``out`` if it was provided
 
     Raises
     ------
     ValueError
-        if the image is already greyscale or if the input image isn't 8bpc
+        if the image is already greyscale or if the input image isn't 8 or
+        16bpc, or if ``out`` doesn't match the image
     '''
-    raise NotImplementedError('Implement this function/method.')
+    if image.ndim != 3 or image.shape[2] != 3:
+        raise ValueError('Image must be a 3-channel RGB image.')
+    dtype = _check_depth(image)
+
+    if out is None:
+        out = np.empty(image.shape[:2], dtype=dtype)
+    else:
+        _check_out(out, image.shape[:2], dtype)
+
+    if fixed_point:
+        return _rgb2grey_fixed(image, out)
+    return _rgb2grey_float(image, out)
 
 
-def grey2rgb(image):
+def grey2rgb(image, out=None, copy=True):
     '''Pseudo-convert a greyscale image into an RGB image.
 
     This will make an greyscale image appear to be RGB by duplicating the
@@ -43,15 +157,37 @@ def grey2rgb(image):
     ----------
     image : numpy.ndarray
         a greyscale image
+    out : numpy.ndarray, optional
+        a ``H x W x 3`` array, with the same bit depth as the image, that the
+        result is written into
+    copy : bool, optional
+        if ``False``, no data is duplicated; instead a read-only view is
+        returned where all three channels refer to the original intensities
 
     Returns
     -------
     numpy.ndarray
-        a three-channel, RGB image
+        a three-channel, RGB image; this is ``out`` if it was provided
 
     Raises
     ------
     ValueError
-        if the input image is already RGB or if the image isn't 8bpc
+        if the input image is already RGB or if the image isn't 8 or 16bpc, or
+        if ``out`` doesn't match the image or is combined with ``copy=False``
     '''
-    raise NotImplementedError('Implement this function/method.')
+    if image.ndim != 2:
+        raise ValueError('Image must be a single-channel greyscale image.')
+    dtype = _check_depth(image)
+
+    if not copy:
+        if out is not None:
+            raise ValueError('An output array cannot be used without copying.')
+        return np.broadcast_to(image[:, :, np.newaxis], image.shape + (3,))
+
+    if out is None:
+        out = np.empty(image.shape + (3,), dtype=dtype)
+    else:
+        _check_out(out, image.shape + (3,), dtype)
+
+    out[...] = image[:, :, np.newaxis]
+    return out
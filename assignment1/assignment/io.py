@@ -1,28 +1,727 @@
+import functools
+import itertools
+import json
+import os
+import pathlib
+import re
+
 import numpy as np
 
+# Maps the NetPBM magic number onto the number of channels and whether or not
+# the raster is stored in binary form.
+_FORMATS = {
+    b'P2': (1, False),
+    b'P3': (3, False),
+    b'P5': (1, True),
+    b'P6': (3, True)
+}
+
+_COMMENT = re.compile(rb'#[^\n]*')
+
+
+def _read_token(f):
+    '''Read the next whitespace-delimited header token from a NetPBM file.
+
+    Comments (a '#' up to the end of the line) are skipped.  The whitespace
+    character that terminates the token is consumed, which means that after
+    reading the last header field the file is positioned at the start of the
+    raster.
+
+    Parameters
+    ----------
+    f : file object
+        file opened in binary mode
+
+    Returns
+    -------
+    bytes
+        the token, or an empty byte string if the end of the file was reached
+    '''
+    token = b''
+    while True:
+        c = f.read(1)
+        if not c:
+            return token
+        if c == b'#':
+            f.readline()
+            if token:
+                return token
+        elif c.isspace():
+            if token:
+                return token
+        else:
+            token += c
+
+
+def _read_header(f):
+    '''Parse a NetPBM header.
+
+    Parameters
+    ----------
+    f : file object
+        file opened in binary mode and positioned at the magic number
+
+    Returns
+    -------
+    magic : bytes
+        the format's magic number, e.g. ``b'P6'``
+    shape : tuple
+        the ``(H, W)`` or ``(H, W, 3)`` image shape
+    maxval : int
+        the largest value a pixel may take
+
+    Raises
+    ------
+    ValueError
+        if the image format is unknown or the header is invalid
+    '''
+    magic = _read_token(f)
+    if magic not in _FORMATS:
+        raise ValueError(f'Unknown format {magic.decode(errors="replace")}')
+
+    try:
+        width, height, maxval = (int(_read_token(f)) for _ in range(3))
+    except ValueError:
+        raise ValueError('Invalid NetPBM header.') from None
+
+    if width <= 0 or height <= 0:
+        raise ValueError(f'Invalid image dimensions {width}x{height}.')
+    if not 0 < maxval < 65536:
+        raise ValueError(f'Invalid maximum value {maxval}.')
+
+    channels, _ = _FORMATS[magic]
+    shape = (height, width) if channels == 1 else (height, width, channels)
+    return magic, shape, maxval
+
+
+def _binary_dtype(maxval):
+    '''The on-disk data type of a binary raster; 16-bit values are big-endian.'''
+    return np.dtype(np.uint8) if maxval < 256 else np.dtype('>u2')
+
+
+def _pixel_dtype(maxval):
+    '''The in-memory data type used for pixels of the given maximum value.'''
+    return np.dtype(np.uint8) if maxval < 256 else np.dtype(np.uint16)
+
+
+def _is_supported(dtype):
+    '''Check for 8 or 16bpc unsigned integers, in either byte order.'''
+    return dtype.kind == 'u' and dtype.itemsize in (1, 2)
+
+
+def _parse_ascii(data, maxval):
+    '''Convert a block of plain-text raster data into pixel values.
+
+    Comments are stripped and then all values are converted with a single
+    ``numpy.fromstring()`` call rather than token by token.
+
+    Parameters
+    ----------
+    data : bytes
+        whitespace-separated decimal values; the block must not end partway
+        through a value
+    maxval : int
+        the largest value a pixel may take
+
+    Returns
+    -------
+    numpy.ndarray
+        a linear array containing the values
+
+    Raises
+    ------
+    ValueError
+        if the data isn't numeric or if any value is outside of [0, maxval]
+    '''
+    if b'#' in data:
+        data = _COMMENT.sub(b'', data)
+    # 'fromstring' reads a whitespace-only string as a single zero.
+    if data.isspace() or not data:
+        return np.empty(0, dtype=_pixel_dtype(maxval))
+
+    try:
+        values = np.fromstring(data, dtype=np.int64, sep=' ')
+    except ValueError:
+        raise ValueError('Image data contains non-numeric values.') from None
+    if values.size > 0 and (values.min() < 0 or values.max() > maxval):
+        raise ValueError(f'Image data is outside of the range [0, {maxval}].')
+    return values.astype(_pixel_dtype(maxval))
+
+
+def _iter_ascii_chunks(f, maxval, chunksize=1 << 24):
+    '''Lazily parse the remainder of a plain-text raster in large chunks.
+
+    Each chunk is cut at its last line break (or, failing that, its last
+    whitespace character) so that neither values nor comments are split
+    between chunks.
+
+    Parameters
+    ----------
+    f : file object
+        file opened in binary mode and positioned at the start of the raster
+    maxval : int
+        the largest value a pixel may take
+    chunksize : int, optional
+        number of bytes read from the file at a time
+
+    Yields
+    ------
+    numpy.ndarray
+        the values contained in the next chunk
+    '''
+    partial = b''
+    while True:
+        chunk = f.read(chunksize)
+        if not chunk:
+            break
+        data = partial + chunk
+        cut = data.rfind(b'\n') + 1 or max(data.rfind(c) for c in (b' ', b'\t', b'\r')) + 1
+        data, partial = data[:cut], data[cut:]
+        yield _parse_ascii(data, maxval)
+    if partial:
+        yield _parse_ascii(partial, maxval)
+
+
+def _read_image(f, filename, mmap):
+    '''Read the image that starts at the file's current position.
+
+    Afterwards the file is positioned immediately after the image's raster,
+    which is where the next image of a multi-image file begins.
+
+    Parameters
+    ----------
+    f : file object
+        file opened in binary mode
+    filename : str
+        the file's name, which is needed to memory-map the raster
+    mmap : bool
+        memory-map a binary raster rather than reading it
+
+    Returns
+    -------
+    numpy.ndarray
+        the loaded image
+    '''
+    magic, shape, maxval = _read_header(f)
+    _, binary = _FORMATS[magic]
+
+    if not binary:
+        if mmap:
+            raise ValueError('Only binary NetPBM images can be memory-mapped.')
+        image = _parse_ascii(f.read(), maxval)
+        if image.size != np.prod(shape):
+            raise ValueError('Image data does not match the header dimensions.')
+        return np.reshape(image, shape)
 
-def imread(filename):
+    dtype = _binary_dtype(maxval)
+    offset = f.tell()
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    if os.fstat(f.fileno()).st_size - offset < nbytes:
+        raise ValueError('Image data is truncated.')
+
+    if mmap:
+        f.seek(offset + nbytes)
+        return np.memmap(filename, dtype=dtype, mode='r', offset=offset, shape=shape)
+
+    image = np.fromfile(f, dtype=dtype, count=int(np.prod(shape)))
+    return np.reshape(image.astype(dtype.newbyteorder('='), copy=False), shape)
+
+
+def _at_end(f):
+    '''Skip any whitespace and check if the end of the file has been reached.'''
+    while True:
+        c = f.read(1)
+        if not c:
+            return True
+        if not c.isspace():
+            f.seek(-1, os.SEEK_CUR)
+            return False
+
+
+def imread(filename, mmap=False, offset=0):
     '''Load a NetPBM image from a file.
 
+    Both the plain (P2/P3) and binary (P5/P6) variants of the greyscale and
+    colour formats are supported.  Images with a maximum value above 255 are
+    loaded as 16-bit; the big-endian binary raster is byte-swapped by NumPy
+    in a single pass.
+
+    Parameters
+    ----------
+    filename : str
+        image file name
+    mmap : bool, optional
+        if ``True``, the raster of a binary image is memory-mapped rather than
+        read into memory; only the header is parsed and the returned array is
+        a read-only ``numpy.memmap`` whose pages are loaded on first access
+    offset : int, optional
+        byte offset of the image within the file; used to read a particular
+        image from a multi-image file (see ``frame_offsets()``)
+
+    Returns
+    -------
+    numpy.ndarray
+        a numpy array with the loaded image; either ``numpy.uint8`` or
+        ``numpy.uint16`` (big-endian when memory-mapped)
+
+    Raises
+    ------
+    ValueError
+        if the image format is unknown or invalid, or if ``mmap`` is requested
+        for a plain-text image
+    '''
+    with open(filename, 'rb') as f:
+        f.seek(offset)
+        return _read_image(f, filename, mmap)
+
+
+def frame_offsets(filename):
+    '''Locate every image in a multi-image NetPBM file.
+
+    The NetPBM formats allow several images to be concatenated into one file.
+    Only the headers are parsed; binary rasters are skipped over with a seek.
+    A plain-text image has no defined end, so it must be the last in a file.
+    The returned offsets can be cached and passed to ``imread()`` to read any
+    image directly.
+
+    Parameters
+    ----------
+    filename : str
+        image file name
+
+    Returns
+    -------
+    list of int
+        the byte offset where each image begins
+
+    Raises
+    ------
+    ValueError
+        if any image header is invalid or a binary raster is truncated
+    '''
+    offsets = []
+    with open(filename, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        while not _at_end(f):
+            offsets.append(f.tell())
+            magic, shape, maxval = _read_header(f)
+            _, binary = _FORMATS[magic]
+            if not binary:
+                break
+
+            nbytes = int(np.prod(shape)) * _binary_dtype(maxval).itemsize
+            if f.tell() + nbytes > size:
+                raise ValueError('Image data is truncated.')
+            f.seek(nbytes, os.SEEK_CUR)
+    return offsets
+
+
+def iter_frames(filename, mmap=False):
+    '''Lazily iterate over the images in a multi-image NetPBM file.
+
+    Parameters
+    ----------
+    filename : str
+        image file name
+    mmap : bool, optional
+        if ``True``, memory-map each binary raster rather than reading it
+
+    Yields
+    ------
+    numpy.ndarray
+        the next image in the file
+
+    Raises
+    ------
+    ValueError
+        if any image is invalid
+    '''
+    with open(filename, 'rb') as f:
+        while not _at_end(f):
+            yield _read_image(f, filename, mmap)
+
+
+def imread_all(filename, mmap=False):
+    '''Load every image in a multi-image NetPBM file.
+
+    Parameters
+    ----------
+    filename : str
+        image file name
+    mmap : bool, optional
+        if ``True``, memory-map each binary raster rather than reading it
+
+    Returns
+    -------
+    list of numpy.ndarray
+        the images, in the order they appear in the file
+
+    Raises
+    ------
+    ValueError
+        if any image is invalid
+    '''
+    return list(iter_frames(filename, mmap))
+
+
+class ImageInfo:
+    '''Metadata describing a NetPBM image, as read from its header.
+
+    Attributes
+    ----------
+    format : str
+        the magic number, e.g. ``'P6'``
+    shape : tuple
+        the ``(H, W)`` or ``(H, W, 3)`` image shape
+    maxval : int
+        the largest value a pixel may take
+    data_offset : int
+        byte offset of the raster within the file
+    '''
+    __slots__ = ('format', 'shape', 'maxval', 'data_offset')
+
+    def __init__(self, format, shape, maxval, data_offset):
+        self.format = format
+        self.shape = tuple(shape)
+        self.maxval = maxval
+        self.data_offset = data_offset
+
+    @property
+    def binary(self):
+        '''bool : ``True`` if the raster is stored in binary form'''
+        return _FORMATS[self.format.encode()][1]
+
+    @property
+    def dtype(self):
+        '''numpy.dtype : the data type ``imread()`` returns for the image'''
+        return _pixel_dtype(self.maxval)
+
+    def __eq__(self, other):
+        if not isinstance(other, ImageInfo):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'ImageInfo({fields})'
+
+
+def improbe(filename, offset=0):
+    '''Read an image's metadata without loading its raster.
+
+    Parameters
+    ----------
+    filename : str
+        image file name
+    offset : int, optional
+        byte offset of the image within the file (see ``frame_offsets()``)
+
+    Returns
+    -------
+    ImageInfo
+        the image metadata
+
+    Raises
+    ------
+    ValueError
+        if the image format is unknown or the header is invalid
+    '''
+    with open(filename, 'rb') as f:
+        f.seek(offset)
+        magic, shape, maxval = _read_header(f)
+        return ImageInfo(magic.decode(), shape, maxval, f.tell())
+
+
+class ProbeIndex:
+    '''A persistent cache of ``improbe()`` results.
+
+    Entries are stored in a JSON file and keyed by each image's absolute path,
+    modification time and size.  Probing an image that hasn't changed since it
+    was indexed therefore costs a single ``os.stat()``.  The index can be used
+    as a context manager, in which case it is saved on exit.
+
+    Attributes
+    ----------
+    filename : pathlib.Path
+        location of the JSON index file
+    '''
+    def __init__(self, filename):
+        '''Open an index, loading any existing entries.
+
+        Parameters
+        ----------
+        filename : path-like object
+            location of the JSON index file; it's created when the index is
+            first saved
+        '''
+        self.filename = pathlib.Path(filename)
+        self._entries = {}
+        self._modified = False
+        if self.filename.exists():
+            with self.filename.open('rt') as f:
+                self._entries = json.load(f)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.save()
+
+    def probe(self, filename):
+        '''Get an image's metadata, reading its header only if it has changed.
+
+        Parameters
+        ----------
+        filename : path-like object
+            image file name
+
+        Returns
+        -------
+        ImageInfo
+            the image metadata
+        '''
+        key = os.path.abspath(filename)
+        stat = os.stat(key)
+        entry = self._entries.get(key)
+        if entry is not None and entry[:2] == [stat.st_mtime_ns, stat.st_size]:
+            return ImageInfo(*entry[2:])
+
+        info = improbe(key)
+        self._entries[key] = [stat.st_mtime_ns, stat.st_size, info.format, list(info.shape),
+                              info.maxval, info.data_offset]
+        self._modified = True
+        return info
+
+    def save(self):
+        '''Write the index to disk if any entries have changed.'''
+        if not self._modified:
+            return
+        # Write to a temporary file first so an interrupted save can't corrupt the index.
+        temporary = self.filename.with_name(self.filename.name + '.tmp')
+        with temporary.open('wt') as f:
+            json.dump(self._entries, f)
+        os.replace(temporary, self.filename)
+        self._modified = False
+
+
+# Number of bytes of plain text parsed at a time when streaming rows; it keeps
+# the parsed values that are held between bands small.
+_STREAM_CHUNK = 1 << 20
+
+
+def iter_rows(filename, band_height):
+    '''Iterate over a NetPBM image in bands of consecutive rows.
+
+    The header is parsed once and the raster is then read one band at a time,
+    so only a single band needs to be in memory.
+
     Parameters
     ----------
     filename : str
         image file name
+    band_height : int
+        number of rows in each band
+
+    Yields
+    ------
+    numpy.ndarray
+        a ``band_height x W`` or ``band_height x W x 3`` block of rows; the
+        last band is shorter if the band height doesn't divide the image height
+
+    Raises
+    ------
+    ValueError
+        if the band height isn't positive or if the image format is unknown or
+        invalid
+    '''
+    if band_height < 1:
+        raise ValueError('Band height must be at least one row.')
+
+    with open(filename, 'rb') as f:
+        magic, shape, maxval = _read_header(f)
+        _, binary = _FORMATS[magic]
+        height = shape[0]
+        row_size = int(np.prod(shape[1:]))
+
+        if binary:
+            dtype = _binary_dtype(maxval)
+        else:
+            # Only the current chunk is kept, along with how much of it the
+            # previous bands have already used.
+            chunks = _iter_ascii_chunks(f, maxval, _STREAM_CHUNK)
+            pending = np.empty(0, dtype=_pixel_dtype(maxval))
+            used = 0
+
+        for start in range(0, height, band_height):
+            rows = min(band_height, height - start)
+            count = rows * row_size
+            if binary:
+                band = np.fromfile(f, dtype=dtype, count=count)
+                if band.size != count:
+                    raise ValueError('Image data is truncated.')
+                band = band.astype(dtype.newbyteorder('='), copy=False)
+            else:
+                parts = []
+                needed = count
+                while needed > 0:
+                    if used == pending.size:
+                        pending = next(chunks, None)
+                        used = 0
+                        if pending is None:
+                            raise ValueError('Image data does not match the header dimensions.')
+                    part = pending[used:used + needed]
+                    parts.append(part)
+                    used += part.size
+                    needed -= part.size
+                band = parts[0] if len(parts) == 1 else np.concatenate([pending[:0]] + parts)
+            yield np.reshape(band, (rows,) + shape[1:])
+
+        # Like imread(), reject plain text with values left over.
+        if not binary and (used < pending.size or any(chunk.size for chunk in chunks)):
+            raise ValueError('Image data does not match the header dimensions.')
+
+
+def _format_header(shape, binary, maxval=255):
+    '''Format the NetPBM header for an image of the given shape.'''
+    if len(shape) == 2:
+        magic = 'P5' if binary else 'P2'
+    elif len(shape) == 3 and shape[2] == 3:
+        magic = 'P6' if binary else 'P3'
+    else:
+        raise ValueError('Can only save greyscale or RGB images.')
+    height, width = shape[:2]
+    return f'{magic}\n{width} {height}\n{maxval}\n'.encode()
+
+
+@functools.lru_cache(maxsize=None)
+def _text_table(maxval):
+    '''Build the table used to format pixel values as text.
+
+    Every value is right-aligned in a fixed-width field followed by a
+    separator, so that a whole raster can be formatted with one gather.
+
+    Parameters
+    ----------
+    maxval : int
+        the largest value in the table
 
     Returns
     -------
     numpy.ndarray
-        a numpy array with the loaded image
+        a ``(maxval + 1) x N`` array of ASCII characters
+    '''
+    width = len(str(maxval))
+    text = ''.join(f'{value:{width}d} ' for value in range(maxval + 1))
+    return np.frombuffer(text.encode(), dtype=np.uint8).reshape(maxval + 1, width + 1)
+
+
+# The NetPBM specification limits lines of plain text to 70 characters.
+_LINE_LENGTH = 70
+
+# Maximum number of values formatted at once when writing plain text.
+_TEXT_BLOCK = 1 << 20
+
+
+def _write_text(f, values, buffer, table):
+    '''Write pixel values as plain text.
+
+    Parameters
+    ----------
+    f : file object
+        file opened in binary mode
+    values : numpy.ndarray
+        linear array of pixel values
+    buffer : numpy.ndarray
+        preallocated character buffer, reused between calls
+    table : numpy.ndarray
+        the formatting table from ``_text_table()``
+    '''
+    per_line = _LINE_LENGTH // table.shape[1]
+    for start in range(0, values.size, _TEXT_BLOCK):
+        block = values[start:start + _TEXT_BLOCK]
+        text = buffer[:block.size]
+        np.take(table, block, axis=0, out=text)
+        text[per_line - 1::per_line, -1] = ord('\n')
+        text[-1, -1] = ord('\n')
+        f.write(memoryview(text))
+
+
+def imwrite_stream(filename, shape, bands, binary=False, maxval=None):
+    '''Save a NetPBM image to a file one band of rows at a time.
+
+    The header is written up front and each band is appended as it arrives,
+    so the complete image never has to be held in memory.  Bands can come
+    straight from ``iter_rows()``.
+
+    Parameters
+    ----------
+    filename : str
+        image file name
+    shape : tuple
+        the ``(H, W)`` or ``(H, W, 3)`` shape of the complete image
+    bands : iterable of numpy.ndarray
+        consecutive blocks of rows, each ``h x W`` or ``h x W x 3``
+    binary : bool, optional
+        if ``True``, save as a binary (P5/P6) image rather than plain text
+        (P2/P3); binary images are smaller and much faster to write
+    maxval : int, optional
+        the maximum value written into the header; defaults to the largest
+        value of the bands' data type.  Pass the source image's maxval, e.g.
+        ``improbe(filename).maxval``, to keep it when copying an image.
 
     Raises
     ------
     ValueError
-        if the image format is unknown or invalid
+        if the image isn't 8 or 16bpc, if the bands don't match the image
+        shape, if the maxval is invalid or if any value is larger than it
     '''
-    raise NotImplementedError('Implement this function/method.')
+    shape = tuple(shape)
+
+    # The first band determines the bit depth of the data.
+    bands = iter(bands)
+    first = next(bands, None)
+    pixel_dtype = np.dtype(np.uint8) if first is None else first.dtype
+    if not _is_supported(pixel_dtype):
+        raise ValueError('Can only support 8-bit or 16-bit images.')
+    if maxval is None:
+        maxval = np.iinfo(pixel_dtype).max
+    elif not 0 < maxval < 65536:
+        raise ValueError(f'Invalid maximum value {maxval}.')
 
+    header = _format_header(shape, binary, maxval)
+    if binary:
+        dtype = _binary_dtype(maxval)
+    else:
+        table = _text_table(maxval)
+        buffer = np.empty((min(_TEXT_BLOCK, np.prod(shape)), table.shape[1]), dtype=np.uint8)
 
-def imwrite(filename, image):
+    rows_written = 0
+    with open(filename, 'wb') as f:
+        f.write(header)
+        for band in itertools.chain([first] if first is not None else [], bands):
+            if band.dtype.itemsize != pixel_dtype.itemsize or not _is_supported(band.dtype):
+                raise ValueError('All bands must have the same bit depth.')
+            if band.shape[1:] != shape[1:] or rows_written + band.shape[0] > shape[0]:
+                raise ValueError(f'Band of shape {band.shape} does not fit an image of '
+                                 f'shape {shape}.')
+            if band.size > 0 and band.max() > maxval:
+                raise ValueError(f'Image data is outside of the range [0, {maxval}].')
+            if binary:
+                # Converting to big-endian is a no-op for 8-bit data.
+                values = np.ascontiguousarray(band, dtype=dtype).reshape(-1)
+                f.write(memoryview(values).cast('B'))
+            else:
+                _write_text(f, np.ascontiguousarray(band).reshape(-1), buffer, table)
+            rows_written += band.shape[0]
+
+    if rows_written != shape[0]:
+        raise ValueError(f'Expected {shape[0]} rows but only {rows_written} were written.')
+
+
+def imwrite(filename, image, binary=False, maxval=None):
     '''Save a NetPBM image to a file.
 
     Parameters
@@ -31,5 +730,17 @@ def imwrite(filename, image):
         image file name
     image : numpy.ndarray
         image being saved
+    binary : bool, optional
+        if ``True``, save as a binary (P5/P6) image rather than plain text
+        (P2/P3)
+    maxval : int, optional
+        the maximum value written into the header; defaults to the largest
+        value of the image's data type (see ``imwrite_stream()``)
+
+    Raises
+    ------
+    ValueError
+        if the image isn't an 8 or 16bpc greyscale or RGB image, if the maxval
+        is invalid or if any value is larger than it
     '''
-    raise NotImplementedError('Implement this function/method.')
+    imwrite_stream(filename, image.shape, [image], binary, maxval)
@@ -0,0 +1,71 @@
+'''Benchmark the plain-text (P2/P3) NetPBM reader.
+
+The vectorised reader in ``assignment.io`` is compared against the original
+token-by-token parser on synthetic 4K and 8K images.  Run it from the
+assignment folder with::
+
+    python -m benchmarks.bench_ascii_read
+'''
+import argparse
+import pathlib
+import tempfile
+import time
+
+import numpy as np
+
+from assignment.io import imread, imwrite
+
+SIZES = {
+    '4K': (2160, 3840),
+    '8K': (4320, 7680)
+}
+
+
+def _token_imread(filename):
+    '''Reference reader that converts every token with a Python ``int()``.'''
+    with open(filename, 'rt') as f:
+        tokens = f.read().split()
+    width, height = int(tokens[1]), int(tokens[2])
+    values = [int(token) for token in tokens[4:]]
+    shape = (height, width) if tokens[0] == 'P2' else (height, width, 3)
+    return np.reshape(np.array(values, dtype=np.uint8), shape)
+
+
+def _best_time(func, filename, repeats):
+    '''Return the fastest of several calls, along with the last result.'''
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func(filename)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--colour', action='store_true', help='benchmark P3 rather than P2')
+    parser.add_argument('--repeats', type=int, default=3, help='timing repetitions')
+    parser.add_argument('--sizes', nargs='+', default=list(SIZES), choices=list(SIZES))
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f'{"size":>4} {"MB":>8} {"token (s)":>10} {"vector (s)":>11} {"speedup":>8}')
+    with tempfile.TemporaryDirectory() as folder:
+        for name in args.sizes:
+            shape = SIZES[name] + ((3,) if args.colour else ())
+            image = rng.integers(0, 256, size=shape, dtype=np.uint8)
+            filename = pathlib.Path(folder) / f'{name}.pnm'
+            imwrite(filename, image)
+            size = filename.stat().st_size / 1e6
+
+            token_time, expected = _best_time(_token_imread, filename, args.repeats)
+            vector_time, result = _best_time(imread, filename, args.repeats)
+            assert np.array_equal(expected, result)
+
+            print(f'{name:>4} {size:8.1f} {token_time:10.3f} {vector_time:11.3f} '
+                  f'{token_time / vector_time:7.1f}x')
+            filename.unlink()
+
+
+if __name__ == '__main__':
+    main()
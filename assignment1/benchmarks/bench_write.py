@@ -0,0 +1,62 @@
+'''Benchmark writing NetPBM images as plain text and as binary.
+
+A synthetic image (50 MP by default) is saved with ``imwrite()`` in both
+forms, as well as with the original row-by-row ``str.join()`` formatter, and
+the write times and file sizes are reported.  Run it from the assignment
+folder with::
+
+    python -m benchmarks.bench_write
+'''
+import argparse
+import pathlib
+import tempfile
+import time
+
+import numpy as np
+
+from assignment.io import imread, imwrite
+
+
+def _join_imwrite(filename, image):
+    '''Reference writer that formats every row with ``str.join()``.'''
+    height, width = image.shape[:2]
+    magic = 'P2' if image.ndim == 2 else 'P3'
+    values = np.reshape(image, (height, -1)).astype(str)
+    with open(filename, 'wt') as f:
+        f.write(f'{magic}\n{width} {height}\n255\n')
+        f.writelines(' '.join(row) + '\n' for row in values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--width', type=int, default=8192, help='image width')
+    parser.add_argument('--height', type=int, default=6144, help='image height')
+    parser.add_argument('--colour', action='store_true', help='benchmark P3/P6 rather than P2/P5')
+    parser.add_argument('--repeats', type=int, default=3, help='timing repetitions')
+    args = parser.parse_args()
+
+    shape = (args.height, args.width) + ((3,) if args.colour else ())
+    image = np.random.default_rng(0).integers(0, 256, size=shape, dtype=np.uint8)
+
+    writers = {
+        'ascii (join)': _join_imwrite,
+        'ascii': lambda filename, image: imwrite(filename, image),
+        'binary': lambda filename, image: imwrite(filename, image, binary=True)
+    }
+
+    print(f'{image.size / 1e6:.1f} million values')
+    print(f'{"writer":>12} {"time (s)":>9} {"size (MB)":>10}')
+    with tempfile.TemporaryDirectory() as folder:
+        filename = pathlib.Path(folder) / 'image.pnm'
+        for name, writer in writers.items():
+            best = np.inf
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                writer(filename, image)
+                best = min(best, time.perf_counter() - start)
+            assert np.array_equal(imread(filename), image)
+            print(f'{name:>12} {best:9.3f} {filename.stat().st_size / 1e6:10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+import pathlib
+import shutil
+
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from assignment.batch import convert_directory, main
+from assignment.colour import grey2rgb
+from assignment.io import imread
+
+
+def test_convert_directory_reports_failures(tmp_path):
+    src = tmp_path / 'src'
+    src.mkdir()
+    shutil.copy(pathlib.Path() / 'samples' / 'rocket.ppm', src / 'a.ppm')
+    shutil.copy(pathlib.Path() / 'samples' / 'colour.ppm', src / 'b.ppm')
+    (src / 'broken.ppm').write_text('P3\n4 4\n255\n1 2 3\n')
+    (src / 'notes.txt').write_text('not an image')
+
+    summary = convert_directory(src, tmp_path / 'dst', workers=2)
+
+    assert sorted(f.name for f in summary.converted) == ['a.pgm', 'b.pgm']
+    assert [f.name for f, _ in summary.failures] == ['broken.ppm']
+    assert summary.nbytes > 0
+
+    expected = imread(pathlib.Path() / 'samples' / 'rocket-greyscale.pgm')
+    assert_array_equal(imread(tmp_path / 'dst' / 'a.pgm'), expected)
+    assert (tmp_path / 'dst' / 'a.pgm').read_bytes().startswith(b'P5')
+
+
+def test_convert_directory_reports_name_collisions(tmp_path):
+    src = tmp_path / 'src'
+    src.mkdir()
+    shutil.copy(pathlib.Path() / 'samples' / 'rocket.ppm', src / 'a.ppm')
+    shutil.copy(pathlib.Path() / 'samples' / 'greyscale.pgm', src / 'a.pgm')
+    shutil.copy(pathlib.Path() / 'samples' / 'colour.ppm', src / 'b.ppm')
+
+    summary = convert_directory(src, tmp_path / 'dst', workers=1)
+
+    assert [f.name for f in summary.converted] == ['b.pgm']
+    assert sorted(f.name for f, _ in summary.failures) == ['a.pgm', 'a.ppm']
+    assert not (tmp_path / 'dst' / 'a.pgm').exists()
+
+
+def test_convert_directory_from_command_line(tmp_path, capsys):
+    src = tmp_path / 'src'
+    src.mkdir()
+    shutil.copy(pathlib.Path() / 'samples' / 'greyscale.pgm', src)
+
+    assert main([str(src), str(tmp_path / 'dst'), '--op', 'grey2rgb', '--workers', '1',
+                 '--text']) == 0
+    assert 'images/s' in capsys.readouterr().out
+    assert (tmp_path / 'dst' / 'greyscale.ppm').read_bytes().startswith(b'P3')
+
+    original = imread(src / 'greyscale.pgm')
+    converted = imread(tmp_path / 'dst' / 'greyscale.ppm')
+    assert converted.dtype == np.uint8
+    assert_array_equal(converted, grey2rgb(original))
@@ -5,7 +5,7 @@ from numpy.testing import assert_array_equal
 import pytest
 
 from assignment.colour import rgb2grey, grey2rgb
-from assignment.io import imread
+from assignment.io import imread, imwrite
 
 
 def test_q3a_convert_rgb_to_greyscale():
@@ -54,3 +54,76 @@ def test_q4b_grey2rgb_handles_invalid_inputs():
 
     with pytest.raises(ValueError):
         grey2rgb(float_greyscale)
+
+
+def test_q3c_fixed_point_matches_floating_point():
+    # Check every possible 8-bit colour, one red value at a time.
+    g, b = np.meshgrid(np.arange(256), np.arange(256), indexing='ij')
+    image = np.zeros((256, 256, 3), dtype=np.uint8)
+    image[:, :, 1] = g
+    image[:, :, 2] = b
+    for r in range(256):
+        image[:, :, 0] = r
+        assert_array_equal(rgb2grey(image), rgb2grey(image, fixed_point=False))
+
+
+def test_q3d_rgb2grey_writes_into_output():
+    image = imread(str(pathlib.Path() / 'samples' / 'rocket.ppm'))
+    expected = imread(str(pathlib.Path() / 'samples' / 'rocket-greyscale.pgm'))
+
+    out = np.empty(image.shape[:2], dtype=np.uint8)
+    assert rgb2grey(image, out=out) is out
+    assert_array_equal(out, expected)
+
+    with pytest.raises(ValueError):
+        rgb2grey(image, out=np.empty(image.shape[:2], dtype=np.uint16))
+
+
+def test_q4c_grey2rgb_writes_into_output():
+    image = imread(str(pathlib.Path() / 'samples' / 'rocket-greyscale.pgm'))
+
+    out = np.empty(image.shape + (3,), dtype=np.uint8)
+    assert grey2rgb(image, out=out) is out
+    for i in range(3):
+        assert_array_equal(out[:, :, i], image)
+
+    with pytest.raises(ValueError):
+        grey2rgb(image, out=np.empty(image.shape, dtype=np.uint8))
+
+
+def test_q4d_grey2rgb_view_shares_memory(tmp_path):
+    image = imread(str(pathlib.Path() / 'samples' / 'rocket-greyscale.pgm'))
+
+    rgb = grey2rgb(image, copy=False)
+    assert rgb.shape == image.shape + (3,)
+    assert not rgb.flags.writeable
+    assert np.shares_memory(rgb, image)
+    assert_array_equal(rgb, grey2rgb(image))
+
+    # Read-only consumers accept the view as if it were a normal image.
+    outfile = tmp_path / 'rocket.ppm'
+    imwrite(str(outfile), rgb)
+    assert_array_equal(imread(str(outfile)), rgb)
+    assert_array_equal(rgb2grey(rgb), rgb2grey(grey2rgb(image)))
+
+
+def test_q3e_16bit_conversions():
+    image = imread(str(pathlib.Path() / 'samples' / 'rocket.ppm')).astype(np.uint16) * 257
+    grey = rgb2grey(image)
+    assert grey.dtype == np.uint16
+    assert np.abs(grey.astype(int) - rgb2grey(image, fixed_point=False)).max() <= 1
+
+    big_endian = image.astype('>u2')
+    assert_array_equal(rgb2grey(big_endian), grey)
+
+    rgb = grey2rgb(grey)
+    assert rgb.dtype == np.uint16
+    for i in range(3):
+        assert_array_equal(rgb[:, :, i], grey)
+
+
+def test_q3f_empty_images():
+    for shape in ((4, 0, 3), (0, 4, 3)):
+        image = np.zeros(shape, dtype=np.uint8)
+        assert rgb2grey(image).shape == shape[:2]
+        assert rgb2grey(image, fixed_point=False).shape == shape[:2]
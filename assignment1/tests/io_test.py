@@ -4,7 +4,9 @@ import numpy as np
 from numpy.testing import assert_array_equal
 import pytest
 
-from assignment.io import imread, imwrite
+from assignment import io
+from assignment.io import (ImageInfo, ProbeIndex, frame_offsets, improbe, imread, imread_all,
+                           imwrite, imwrite_stream, iter_frames, iter_rows)
 
 
 def test_q1a_read_greyscale_image():
@@ -48,12 +50,41 @@ def test_q1b_read_colour_image():
     assert_array_equal(expected, image)
 
 
-def test_q1c_unsupported_type_raises_exception():
-    filename = pathlib.Path() / 'samples' / 'colour-binary.pbm'
+def test_q1c_unsupported_type_raises_exception(tmp_path):
+    # Binary greyscale/colour images are supported but bitmaps are not.
+    filename = tmp_path / 'bitmap.pbm'
+    filename.write_text('P1\n2 2\n0 1\n1 0\n')
     with pytest.raises(ValueError):
         imread(filename.absolute())
 
 
+def test_q1d_read_binary_colour_image():
+    expected = imread(pathlib.Path() / 'samples' / 'colour.ppm')
+    filename = pathlib.Path() / 'samples' / 'colour-binary.pbm'
+    image = imread(filename.absolute())
+    assert image.dtype == np.uint8
+    assert_array_equal(expected, image)
+
+
+def test_q1e_memory_map_binary_image(tmp_path):
+    expected = imread(pathlib.Path() / 'samples' / 'colour.ppm')
+    filename = pathlib.Path() / 'samples' / 'colour-binary.pbm'
+    image = imread(filename.absolute(), mmap=True)
+    assert isinstance(image, np.memmap)
+    assert not image.flags.writeable
+    assert_array_equal(expected, image)
+
+    # 16-bit rasters are mapped as big-endian values.
+    outfile = tmp_path / 'deep.pgm'
+    outfile.write_bytes(b'P5\n# 16-bit\n2 1\n65535\n' + bytes([1, 2, 255, 254]))
+    image = imread(outfile, mmap=True)
+    assert_array_equal(image, [[0x0102, 0xfffe]])
+
+    # Only binary rasters can be mapped.
+    with pytest.raises(ValueError):
+        imread(pathlib.Path() / 'samples' / 'colour.ppm', mmap=True)
+
+
 def test_q2a_write_greyscale_image(tmp_path):
     image = np.array([
         [255, 0,   255, 255],
@@ -111,3 +142,199 @@ def test_q2b_write_colour_image(tmp_path):
         expected = f.read().split()
 
     assert generated == expected
+
+
+def test_q2c_stream_bands_between_files(tmp_path):
+    for name in ['rocket.ppm', 'colour-binary.pbm']:
+        infile = pathlib.Path() / 'samples' / name
+        expected = imread(infile)
+
+        bands = list(iter_rows(infile, 100))
+        assert all(band.shape[1:] == expected.shape[1:] for band in bands)
+        assert_array_equal(np.concatenate(bands), expected)
+
+        outfile = tmp_path / 'streamed.ppm'
+        imwrite_stream(outfile, expected.shape, iter_rows(infile, 64))
+        assert_array_equal(imread(outfile), expected)
+
+
+def test_q2d_stream_rejects_mismatched_bands(tmp_path):
+    band = np.zeros((2, 4), dtype=np.uint8)
+    with pytest.raises(ValueError):
+        imwrite_stream(tmp_path / 'short.pgm', (5, 4), [band, band])
+    with pytest.raises(ValueError):
+        imwrite_stream(tmp_path / 'wide.pgm', (4, 5), [band, band])
+    with pytest.raises(ValueError):
+        list(iter_rows(pathlib.Path() / 'samples' / 'greyscale.pgm', 0))
+
+
+def test_q2g_stream_plain_text_in_bounded_chunks(tmp_path, monkeypatch):
+    image = (np.arange(40 * 30) % 256).astype(np.uint8).reshape(40, 30)
+    filename = tmp_path / 'large.pgm'
+    imwrite(filename, image)
+
+    # Record the number of values in each chunk as it's parsed.
+    sizes = []
+    original = io._iter_ascii_chunks
+
+    def counted_chunks(f, maxval, chunksize):
+        for values in original(f, maxval, chunksize):
+            sizes.append(values.size)
+            yield values
+
+    monkeypatch.setattr(io, '_STREAM_CHUNK', 256)
+    monkeypatch.setattr(io, '_iter_ascii_chunks', counted_chunks)
+    consumed = 0
+    for band in iter_rows(filename, 1):
+        assert_array_equal(band, image[consumed // 30:consumed // 30 + 1])
+        consumed += band.size
+        # A chunk is only parsed once the previous ones have been used up.
+        assert sum(sizes[:-1]) < consumed <= sum(sizes)
+    assert consumed == image.size
+
+
+def test_q1f_plain_text_raster_validation(tmp_path):
+    # Comments may appear anywhere in the file.
+    filename = tmp_path / 'comments.pgm'
+    filename.write_text('P2\n# header\n2 2\n255\n1 2 # first row\n3 4\n')
+    assert_array_equal(imread(filename), [[1, 2], [3, 4]])
+    assert_array_equal(np.concatenate(list(iter_rows(filename, 1))), [[1, 2], [3, 4]])
+
+    invalid = {
+        'truncated.pgm': 'P2\n2 2\n255\n1 2 3\n',
+        'extra.pgm': 'P2\n2 1\n255\n1 2 3 4\n',
+        'over-range.pgm': 'P2\n2 2\n100\n1 2 3 101\n',
+        'negative.pgm': 'P2\n2 2\n255\n1 2 3 -4\n',
+        'non-numeric.pgm': 'P2\n2 2\n255\n1 2 3 x\n',
+        'empty.pgm': 'P2\n1 1\n255\n  \n',
+    }
+    for name, contents in invalid.items():
+        filename = tmp_path / name
+        filename.write_text(contents)
+        with pytest.raises(ValueError):
+            imread(filename)
+        with pytest.raises(ValueError):
+            list(iter_rows(filename, 1))
+
+
+def test_q2e_write_binary_image(tmp_path):
+    for name in ['greyscale.pgm', 'rocket.ppm']:
+        image = imread(pathlib.Path() / 'samples' / name)
+        outfile = tmp_path / name
+        imwrite(str(outfile), image, binary=True)
+
+        with outfile.open('rb') as f:
+            assert f.read(2) == (b'P5' if image.ndim == 2 else b'P6')
+        assert outfile.stat().st_size < (pathlib.Path() / 'samples' / name).stat().st_size
+        assert_array_equal(imread(outfile), image)
+
+
+def test_q2f_16bit_round_trip(tmp_path):
+    rng = np.random.default_rng(0)
+    for shape in [(7, 5), (7, 5, 3)]:
+        image = rng.integers(0, 65536, size=shape, dtype=np.uint16)
+        for binary in [False, True]:
+            outfile = tmp_path / f'deep-{len(shape)}-{binary}.pnm'
+            imwrite(str(outfile), image, binary=binary)
+            with outfile.open('rb') as f:
+                assert f.read().split()[3] == b'65535'
+
+            loaded = imread(outfile)
+            assert loaded.dtype == np.uint16
+            assert_array_equal(loaded, image)
+            assert_array_equal(np.concatenate(list(iter_rows(outfile, 3))), image)
+
+        # A memory-mapped image can be written straight back out.
+        mapped = imread(outfile, mmap=True)
+        assert mapped.dtype == np.dtype('>u2')
+        imwrite(str(tmp_path / 'copy.pnm'), mapped, binary=True)
+        assert outfile.read_bytes() == (tmp_path / 'copy.pnm').read_bytes()
+
+
+def test_q2h_keep_source_maxval(tmp_path):
+    # A 12-bit scan keeps its maxval, and so its brightness, when copied.
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 4096, size=(9, 7), dtype=np.uint16)
+    infile = tmp_path / 'scan.pgm'
+    with infile.open('wb') as f:
+        f.write(b'P5\n7 9\n4095\n')
+        f.write(image.astype('>u2').tobytes())
+
+    maxval = improbe(infile).maxval
+    assert maxval == 4095
+    outfile = tmp_path / 'copy.pgm'
+    imwrite_stream(outfile, image.shape, iter_rows(infile, 4), binary=True, maxval=maxval)
+    assert outfile.read_bytes() == infile.read_bytes()
+
+    imwrite(tmp_path / 'text.pgm', imread(infile), maxval=maxval)
+    assert improbe(tmp_path / 'text.pgm').maxval == 4095
+    assert_array_equal(imread(tmp_path / 'text.pgm'), image)
+
+    # 8-bit images with a smaller maxval are kept as well.
+    imwrite(tmp_path / 'small.pgm', np.array([[0, 7]], dtype=np.uint8), binary=True, maxval=7)
+    assert improbe(tmp_path / 'small.pgm').maxval == 7
+
+    with pytest.raises(ValueError):
+        imwrite(tmp_path / 'bad.pgm', image, maxval=255)
+    with pytest.raises(ValueError):
+        imwrite(tmp_path / 'bad.pgm', image, maxval=0)
+
+
+def test_q1g_read_multi_image_file(tmp_path):
+    rng = np.random.default_rng(0)
+    frames = [
+        rng.integers(0, 256, size=(4, 6, 3), dtype=np.uint8),
+        rng.integers(0, 65536, size=(3, 2), dtype=np.uint16),
+        rng.integers(0, 256, size=(5, 5), dtype=np.uint8),
+    ]
+
+    # Concatenate binary frames and finish with a plain-text frame.
+    filename = tmp_path / 'frames.pnm'
+    with filename.open('wb') as f:
+        for i, frame in enumerate(frames):
+            imwrite(str(tmp_path / 'frame.pnm'), frame, binary=i < len(frames) - 1)
+            f.write((tmp_path / 'frame.pnm').read_bytes())
+
+    offsets = frame_offsets(filename)
+    assert len(offsets) == len(frames)
+    for frame, loaded in zip(frames, imread_all(filename)):
+        assert_array_equal(loaded, frame)
+    for frame, loaded in zip(frames[:2], iter_frames(filename, mmap=True)):
+        assert_array_equal(loaded, frame)
+    for frame, offset in reversed(list(zip(frames, offsets))):
+        assert_array_equal(imread(filename, offset=offset), frame)
+
+
+def test_q1h_probe_image_metadata(tmp_path):
+    info = improbe(pathlib.Path() / 'samples' / 'rocket.ppm')
+    assert info.format == 'P3'
+    assert info.shape == (427, 640, 3)
+    assert info.maxval == 255
+    assert info.dtype == np.uint8
+    assert not info.binary
+
+    info = improbe(pathlib.Path() / 'samples' / 'colour-binary.pbm')
+    assert info.binary
+    assert info.data_offset == len(b'P6\n4\n4\n255\n')
+
+
+def test_q1i_probe_index_skips_unchanged_files(tmp_path, monkeypatch):
+    filename = tmp_path / 'image.pgm'
+    imwrite(str(filename), np.zeros((2, 3), dtype=np.uint8))
+    index_file = tmp_path / 'index.json'
+
+    with ProbeIndex(index_file) as index:
+        assert index.probe(filename).shape == (2, 3)
+
+    # A reloaded index answers from the cache without reading the header.
+    from assignment import io
+    monkeypatch.setattr(io, '_read_header', None)
+    index = ProbeIndex(index_file)
+    assert len(index) == 1
+    assert index.probe(filename) == ImageInfo('P2', (2, 3), 255, 11)
+    monkeypatch.undo()
+
+    # Changing the file invalidates its entry.
+    imwrite(str(filename), np.zeros((4, 5), dtype=np.uint16))
+    assert index.probe(filename).shape == (4, 5)
+    assert index.probe(filename).maxval == 65535
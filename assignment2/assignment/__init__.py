@@ -2,6 +2,9 @@
 import numpy as np
 from skimage import io
 
+from . import analysis, point_operators
+from .point_operators import _LEVELS
+
 def histogram(image):
     """
     Compute the histogram for an 8-bpc image.
@@ -12,18 +15,16 @@ def histogram(image):
     Returns:
     hist (ndarray): The computed histogram.
     """
-    c = [0] * 256
     if image.dtype != 'uint8':
         raise TypeError("Input image must be an 8-bit image.")
-    hist, bins = np.histogram(image, bins=range(257))
-    return hist
+    return analysis._bincount(image)
 
 def apply_lut(image, lut):
     """
     Apply a LUT onto an image.
     
     Parameters:
-    image (ndarray): An 8-bpc image represented as a numpy array.
+    image (ndarray): An 8-bpc greyscale or colour image represented as a numpy array.
     lut (ndarray): An 8-bit LUT represented as a numpy array.
     
     Returns:
@@ -33,10 +34,8 @@ def apply_lut(image, lut):
         raise TypeError("Input image must be an 8-bit image.")
     if len(lut) != 256:
         raise ValueError("LUT must be 256-elements long.")
-    result = np.zeros_like(image)
-    for i in range(3):
-        result[:,:,i] = np.take(lut, image[:,:,i])
-    return result
+    lut = np.asarray(lut).astype(np.uint8, copy=False)
+    return point_operators.apply_lut(image, lut)
 
 def adjust_brightness(lut, factor):
     """
@@ -49,13 +48,8 @@ def adjust_brightness(lut, factor):
     Returns:
     lut (ndarray): The created LUT.
     """
-    for i in range(256):
-        value = int(i*factor)
-        if value < 0:
-            value = 0
-        elif value > 255:
-            value = 255
-        lut[i] = value
+    # Clipping before the conversion truncates exactly like int() would.
+    lut[:] = np.clip(_LEVELS*factor, 0, 255).astype(np.uint8)
     return lut
 
 def adjust_contrast(lut, factor):
@@ -69,13 +63,7 @@ def adjust_contrast(lut, factor):
     Returns:
     lut (ndarray): The created LUT.
     """
-    for i in range(256):
-        value = int(128 + factor*(i-128))
-        if value < 0:
-            value = 0
-        elif value > 255:
-            value = 255
-        lut[i] = value
+    lut[:] = np.clip(128 + factor*(_LEVELS-128), 0, 255).astype(np.uint8)
     return lut
 
 def adjust_exposure(lut, factor):
@@ -89,9 +77,7 @@ def adjust_exposure(lut, factor):
     Returns:
     lut (ndarray): The created LUT.
     """
-    for i in range(256):
-        value = int(255*(i/255)**factor)
-        lut[i] = value
+    lut[:] = np.clip(255*(_LEVELS/255)**factor, 0, 255).astype(np.uint8)
     return lut
 
 def log_transform(lut):
@@ -104,9 +90,7 @@ def log_transform(lut):
     Returns:
     lut (ndarray): The created LUT.
     """
-    for i in range(256):
-        value = int(255*np.log(1+i)/np.log(256))
-        lut[i] = value
+    lut[:] = (255*np.log(1+_LEVELS)/np.log(256)).astype(np.uint8)
     return lut
 
 c = [0] * 256
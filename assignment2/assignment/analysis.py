@@ -1,7 +1,111 @@
+import concurrent.futures
+
 import numpy as np
 
+from ._util import BLOCK, row_blocks
+
+
+def _bincount(values, levels=256, offsets=None):
+    '''Count the occurrences of each intensity value.
+
+    This is the one histogram kernel shared by every histogram function in the
+    assignment.  The values are counted in blocks of rows since
+    ``numpy.bincount()`` converts its input to a full-size integer array first.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        an unsigned integer array of any shape
+    levels : int, optional
+        number of possible intensity values; 256 for 8bpc data
+    offsets : numpy.ndarray, optional
+        amounts added to the values before counting, broadcast along the last
+        axis; used to count each colour channel into its own ``levels``-long
+        section of one histogram
+
+    Returns
+    -------
+    numpy.ndarray
+        a ``levels``-element array with the number of times each value appears;
+        with ``offsets``, the histogram is ``levels`` times as long as the
+        largest offset would require
+    '''
+    if values.ndim < 2:
+        values = values.reshape(-1, 1)
+    if offsets is not None:
+        levels *= offsets.size
+    # Larger histograms need larger blocks to amortize summing them.
+    hist = np.zeros(levels, dtype=np.int64)
+    for rows in row_blocks(values.shape, pixels=max(BLOCK, 4*levels)):
+        chunk = values[rows]
+        if offsets is not None:
+            chunk = chunk + offsets
+        hist += np.bincount(chunk.reshape(-1), minlength=levels)
+    return hist
+
+
+def _tiled_bincount(img, workers):
+    '''Compute a histogram from row tiles processed on a thread pool.
+
+    ``numpy.bincount()`` releases the GIL, so the tiles are counted in
+    parallel.  The partial histograms are integer counts, which makes the
+    reduction exact and the result identical to a single-threaded count.
+
+    Parameters
+    ----------
+    img : numpy.ndarray
+        an 8bpc array of any shape
+    workers : int
+        number of threads; one means the image is counted on the calling thread
+
+    Returns
+    -------
+    numpy.ndarray
+        a 256-element array with the number of times each value appears
+    '''
+    if workers < 1:
+        raise ValueError('Need at least one worker.')
+    if workers == 1 or img.ndim == 0 or img.shape[0] < 2:
+        return _bincount(img)
+
+    # Several tiles per worker keeps the threads busy if some finish early.
+    tiles = np.array_split(img, min(img.shape[0], 4*workers))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(_bincount, tiles))
+
+
+def _quantile(cdf, q):
+    '''Find the smallest intensity with at least a fraction ``q`` of pixels at or below it.
+
+    Parameters
+    ----------
+    cdf : numpy.ndarray
+        the cumulative sum of a histogram
+    q : float
+        a value on [0, 1]
 
-def histogram(img):
+    Returns
+    -------
+    int
+        the intensity
+    '''
+    if not 0 <= q <= 1:
+        raise ValueError('Quantile must be on [0, 1].')
+    if cdf[-1] == 0:
+        raise ValueError('Histogram must contain at least one pixel.')
+    rank = max(1, int(np.ceil(q * cdf[-1])))
+    return int(np.searchsorted(cdf, rank))
+
+
+def _check_greyscale(img):
+    '''Ensure that the image is an 8bpc greyscale image.'''
+    if img.dtype != np.uint8:
+        raise TypeError('Can only work on 8-bit images.')
+    if img.ndim != 2:
+        raise ValueError('Convert colour image to greyscale before processing.')
+
+
+def histogram(img, workers=1):
     '''Compute the histogram of an image.
 
     This function can only support processing 8bpc images, greyscale or colour.
@@ -11,6 +115,9 @@ def histogram(img):
     ----------
     img : numpy.ndarray
         a ``H x W`` greyscale image
+    workers : int, optional
+        number of threads used to count row tiles of the image in parallel;
+        the result is identical for any number of workers
 
     Returns
     -------
@@ -20,20 +127,29 @@ def histogram(img):
     Raises
     ------
     ValueError
-        if the image isn't greyscale
+        if the image isn't greyscale or ``workers`` is less than one
     TypeError
         if the image isn't the ``numpy.uint8`` data type
     '''
-    raise NotImplementedError('Implement this function/method.')
+    _check_greyscale(img)
+    return _tiled_bincount(img, workers)
 
 
-def estimate_brightness(img):
+def estimate_brightness(img, hist=None, workers=1):
     '''Estimate the average image brightness.
 
+    The brightness is derived from the image histogram, so a histogram that
+    was already computed with ``histogram()`` can be reused rather than making
+    another pass over the image.
+
     Parameters
     ----------
     img : numpy.ndarray
         a ``H x W`` greyscale image
+    hist : numpy.ndarray, optional
+        the image's histogram, if already known
+    workers : int, optional
+        number of threads used to compute the histogram if it isn't provided
 
     Returns
     -------
@@ -48,15 +164,13 @@ def estimate_brightness(img):
     TypeError
         if the image isn't 8bpc
     '''
-    if img.dtype != np.uint8:
-        raise TypeError('Can only work on 8-bit images.')
-    if img.ndim != 2:
-        raise ValueError('Convert colour image to greyscale before processing.')
+    _check_greyscale(img)
+    if hist is None:
+        hist = _tiled_bincount(img, workers)
+    return ImageStats(hist).brightness
 
-    return int(img.mean())
 
-
-def estimate_contrast(img, percentile=0.95, provide_limits=False):
+def estimate_contrast(img, percentile=0.95, provide_limits=False, hist=None, workers=1):
     '''Estimate the amount of contrast in the image.
 
     Parameters
@@ -67,6 +181,10 @@ def estimate_contrast(img, percentile=0.95, provide_limits=False):
         the percentile used to define the centre of mass, by default 0.95
     provide_limits : bool, optional
         if provided, then the limits are returned instead of the difference
+    hist : numpy.ndarray, optional
+        the image's histogram, if already known
+    workers : int, optional
+        number of threads used to compute the histogram if it isn't provided
 
     Returns
     -------
@@ -79,13 +197,316 @@ def estimate_contrast(img, percentile=0.95, provide_limits=False):
     if percentile <= 0.5:
         raise ValueError('Percentile must be larger than 0.5.')
 
-    cdf = histogram(img).cumsum()
-    cdf = cdf.astype(float) / cdf[-1]
+    if hist is None:
+        hist = histogram(img, workers)
+    return ImageStats(hist).contrast(percentile, provide_limits)
+
+
+class ImageStats:
+    '''Statistics of a greyscale image, all derived from its histogram.
+
+    Once the histogram is known, none of the statistics need to look at the
+    image again.  Applying a LUT to the image remaps its histogram, so the
+    statistics of the processed image can be found with ``apply_lut()``
+    without processing any pixels.
+
+    Attributes
+    ----------
+    hist : numpy.ndarray
+        the 256-element image histogram
+    '''
+    def __init__(self, hist):
+        '''Initialize the statistics from a histogram.
+
+        Parameters
+        ----------
+        hist : numpy.ndarray
+            a 256-element image histogram
+
+        Raises
+        ------
+        ValueError
+            if the histogram isn't 256 elements or is empty
+        '''
+        hist = np.asarray(hist, dtype=np.int64)
+        if hist.shape != (256,):
+            raise ValueError('Histogram must be 256-elements long.')
+        self.hist = hist
+        self._cdf = hist.cumsum()
+        if self._cdf[-1] == 0:
+            raise ValueError('Histogram must contain at least one pixel.')
+
+    @property
+    def count(self):
+        '''int : number of pixels in the image'''
+        return int(self._cdf[-1])
+
+    @property
+    def mean(self):
+        '''float : the average intensity'''
+        # Integer arithmetic gives the exact sum, so this matches 'img.mean()'.
+        return int(np.dot(self.hist, np.arange(256, dtype=np.int64))) / self.count
+
+    @property
+    def brightness(self):
+        '''int : the brightness, as reported by ``estimate_brightness()``'''
+        return int(self.mean)
+
+    @property
+    def std(self):
+        '''float : the standard deviation of the intensities'''
+        deviation = np.arange(256) - self.mean
+        return float(np.sqrt(np.dot(self.hist, deviation**2) / self.count))
+
+    @property
+    def minimum(self):
+        '''int : the smallest intensity in the image'''
+        return int(np.flatnonzero(self.hist)[0])
+
+    @property
+    def maximum(self):
+        '''int : the largest intensity in the image'''
+        return int(np.flatnonzero(self.hist)[-1])
+
+    @property
+    def median(self):
+        '''int : the median intensity; the lower median for an even pixel count'''
+        return self.quantile(0.5)
+
+    def quantile(self, q):
+        '''Find the smallest intensity with at least a fraction ``q`` of pixels at or below it.
+
+        Parameters
+        ----------
+        q : float
+            a value on [0, 1]
+
+        Returns
+        -------
+        int
+            the intensity
+        '''
+        return _quantile(self._cdf, q)
+
+    def contrast(self, percentile=0.95, provide_limits=False):
+        '''Estimate the amount of contrast, as in ``estimate_contrast()``.
+
+        Parameters
+        ----------
+        percentile : float, optional
+            the percentile used to define the centre of mass, by default 0.95
+        provide_limits : bool, optional
+            if provided, then the limits are returned instead of the difference
+
+        Returns
+        -------
+        contrast : int
+            the estimated image contrast
+        limits : ``(I_min, I_max)``
+            a tuple containing the minimum/maximum contrast limits; only
+            returned if ``provided_limits`` is ``True``
+        '''
+        if percentile <= 0.5:
+            raise ValueError('Percentile must be larger than 0.5.')
+
+        # Each limit is the last intensity with less than the fraction of
+        # pixels below it, or zero if the first bin already holds more.
+        cdf = self._cdf.astype(float) / self._cdf[-1]
+        Imax = max(0, int(np.searchsorted(cdf, percentile)) - 1)
+        Imin = max(0, int(np.searchsorted(cdf, 1 - percentile)) - 1)
+
+        if provide_limits:
+            return Imin, Imax
+        else:
+            return Imax - Imin
+
+    def apply_lut(self, lut):
+        '''Get the statistics of the image after a LUT has been applied to it.
+
+        Every pixel with intensity ``i`` becomes ``lut[i]``, so the new
+        histogram is found by moving each bin of the current one.
+
+        Parameters
+        ----------
+        lut : numpy.ndarray
+            a 256-element, 8-bit array
+
+        Returns
+        -------
+        ImageStats
+            the statistics of the processed image
+        '''
+        if lut.dtype != np.uint8:
+            raise TypeError('LUT must be 8bpc.')
+        if lut.shape != (256,):
+            raise ValueError('LUT must be 256-elements long.')
+        hist = np.zeros(256, dtype=np.int64)
+        np.add.at(hist, lut, self.hist)
+        return ImageStats(hist)
+
+
+def image_stats(img, workers=1):
+    '''Compute the statistics of an image with a single histogram pass.
+
+    Parameters
+    ----------
+    img : numpy.ndarray
+        a ``H x W`` greyscale image
+    workers : int, optional
+        number of threads used to compute the histogram
+
+    Returns
+    -------
+    ImageStats
+        the image statistics
+
+    Raises
+    ------
+    ValueError
+        if the image is colour or has no pixels
+    TypeError
+        if the image isn't 8bpc
+    '''
+    return ImageStats(histogram(img, workers))
+
+
+class HistogramAccumulator:
+    '''A running histogram for images that arrive in pieces.
+
+    Blocks of pixels, such as image tiles or video frames, are added with
+    ``update()`` and can later be removed with ``subtract()``, e.g. to keep a
+    histogram over a sliding window of frames.  The cumulative sum used by
+    ``cdf()`` and ``percentile()`` is cached, and only recomputed after the
+    histogram changes, so these queries cost O(256) rather than a pass over
+    the pixels.
+
+    Attributes
+    ----------
+    hist : numpy.ndarray
+        the 256-element accumulated histogram
+    '''
+    def __init__(self):
+        self.hist = np.zeros(256, dtype=np.int64)
+        self._cdf = None
+
+    @staticmethod
+    def _count(block):
+        '''Histogram a block of pixels.'''
+        if block.dtype != np.uint8:
+            raise TypeError('Can only work on 8-bit images.')
+        return _bincount(block)
+
+    @property
+    def count(self):
+        '''int : number of pixels in the histogram'''
+        return int(self._cumsum()[-1])
+
+    def _cumsum(self):
+        '''Get the cumulative sum, recomputing it only if the histogram changed.'''
+        if self._cdf is None:
+            self._cdf = self.hist.cumsum()
+        return self._cdf
+
+    def update(self, block):
+        '''Add a block of pixels to the histogram.
+
+        Parameters
+        ----------
+        block : numpy.ndarray
+            an 8bpc array of any shape
+
+        Returns
+        -------
+        HistogramAccumulator
+            this accumulator
+
+        Raises
+        ------
+        TypeError
+            if the block isn't 8bpc
+        '''
+        self.hist += self._count(block)
+        self._cdf = None
+        return self
+
+    def subtract(self, block):
+        '''Remove a block of pixels that was previously added.
+
+        Parameters
+        ----------
+        block : numpy.ndarray
+            an 8bpc array of any shape
+
+        Returns
+        -------
+        HistogramAccumulator
+            this accumulator
+
+        Raises
+        ------
+        TypeError
+            if the block isn't 8bpc
+        ValueError
+            if the block contains pixels that aren't in the histogram
+        '''
+        counts = self._count(block)
+        if np.any(counts > self.hist):
+            raise ValueError('Cannot remove pixels that were never added.')
+        self.hist -= counts
+        self._cdf = None
+        return self
+
+    def merge(self, other):
+        '''Add the contents of another accumulator to this one.
+
+        Parameters
+        ----------
+        other : HistogramAccumulator
+            the accumulator to merge; it is left unchanged
+
+        Returns
+        -------
+        HistogramAccumulator
+            this accumulator
+        '''
+        self.hist += other.hist
+        self._cdf = None
+        return self
+
+    def cdf(self):
+        '''Get the normalized cumulative distribution of the accumulated pixels.
+
+        Returns
+        -------
+        numpy.ndarray
+            a 256-element array on [0, 1]
+        '''
+        cdf = self._cumsum()
+        if cdf[-1] == 0:
+            raise ValueError('Histogram must contain at least one pixel.')
+        return cdf / cdf[-1]
+
+    def percentile(self, p):
+        '''Find the smallest intensity with at least a fraction ``p`` of pixels at or below it.
+
+        Parameters
+        ----------
+        p : float
+            a value on [0, 1]
+
+        Returns
+        -------
+        int
+            the intensity
+        '''
+        return _quantile(self._cumsum(), p)
 
-    Imax = np.argwhere(cdf < percentile)[-1].squeeze()
-    Imin = np.argwhere(cdf < 1 - percentile)[-1].squeeze()
+    def stats(self):
+        '''Get the full set of statistics for the accumulated pixels.
 
-    if provide_limits:
-        return Imin, Imax
-    else:
-        return Imax - Imin
+        Returns
+        -------
+        ImageStats
+            statistics derived from the accumulated histogram
+        '''
+        return ImageStats(self.hist.copy())
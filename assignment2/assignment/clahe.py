@@ -0,0 +1,155 @@
+import concurrent.futures
+
+import numpy as np
+
+from . import analysis, point_operators
+from ._util import row_blocks
+
+
+def _tile_edges(length, tiles):
+    '''Split ``length`` pixels into ``tiles`` near-equal spans; returns the ``tiles + 1`` edges.'''
+    return np.linspace(0, length, tiles + 1).astype(np.intp)
+
+
+def _clipped_lut(tile, clip_limit):
+    '''Build the equalization LUT of one tile from its contrast-limited histogram.
+
+    Counts above the limit are clipped and the excess is spread evenly across
+    every bin, which caps the slope of the tile's transfer function.
+    '''
+    hist = analysis.histogram(tile).astype(np.float64)
+    if clip_limit is not None:
+        limit = clip_limit * tile.size / hist.size
+        excess = np.maximum(hist - limit, 0).sum()
+        np.minimum(hist, limit, out=hist)
+        hist += excess / hist.size
+    return point_operators._equalization_lut(hist, np.uint8)
+
+
+def _interpolation(length, edges):
+    '''Find the neighbouring tiles and blending weights along one image axis.
+
+    Every pixel lies between the centres of two adjacent tiles (or beyond the
+    outermost centre, where both neighbours are the same tile).
+
+    Returns
+    -------
+    lower : numpy.ndarray
+        index of the tile whose centre is at or before each pixel
+    upper : numpy.ndarray
+        index of the tile whose centre is after each pixel
+    weight : numpy.ndarray
+        ``float32`` weight of the ``upper`` tile
+    '''
+    centres = (edges[:-1] + edges[1:] - 1) / 2
+    position = np.arange(length)
+    upper = np.searchsorted(centres, position, side='right')
+    lower = np.clip(upper - 1, 0, centres.size - 1)
+    upper = np.clip(upper, 0, centres.size - 1)
+    span = centres[upper] - centres[lower]
+    weight = np.divide(position - centres[lower], span, out=np.zeros(length), where=span > 0)
+    return lower, upper, weight.astype(np.float32)
+
+
+def _interpolate(img, out, luts, rows, cols, start, stop):
+    '''Bilinearly blend the four surrounding tile LUTs for a band of rows.'''
+    row_lower, row_upper, row_weight = rows
+    col_lower, col_upper, col_weight = cols
+    stride = luts.shape[1] * 256
+    luts = luts.reshape(-1)
+
+    for band in row_blocks(img.shape, start, stop):
+        # Offsets of each pixel's four tile LUTs in the flattened table.
+        values = img[band].astype(np.intp)
+        left = col_lower * 256 + values
+        right = col_upper * 256 + values
+        top = row_lower[band, np.newaxis] * stride
+        bottom = row_upper[band, np.newaxis] * stride
+
+        upper_row = np.take(luts, top + left)
+        upper_row += col_weight * (np.take(luts, top + right) - upper_row)
+        lower_row = np.take(luts, bottom + left)
+        lower_row += col_weight * (np.take(luts, bottom + right) - lower_row)
+        upper_row += row_weight[band, np.newaxis] * (lower_row - upper_row)
+
+        np.rint(upper_row, out=upper_row)
+        np.copyto(out[band], upper_row, casting='unsafe')
+
+
+def clahe(img, tiles=(8, 8), clip_limit=2.0, out=None, workers=1):
+    '''Perform contrast-limited adaptive histogram equalization (CLAHE).
+
+    The image is split into a grid of tiles and each tile gets its own
+    equalization LUT, computed from a histogram whose bins are clipped at
+    ``clip_limit`` times the average bin count.  Every pixel is then mapped
+    through the LUTs of the four nearest tiles, bilinearly weighted by its
+    distance to their centres, so that there are no seams between tiles.
+
+    With a single tile and no clip limit, the result is the same as
+    ``point_operators.equalize()``.
+
+    Parameters
+    ----------
+    img : numpy.ndarray
+        a ``H x W`` greyscale 8bpc image
+    tiles : ``(int, int)``, optional
+        number of tiles along the rows and columns of the image
+    clip_limit : float or None, optional
+        maximum histogram count, as a multiple of the average count per bin;
+        ``None`` disables clipping, which gives plain adaptive equalization
+    out : numpy.ndarray, optional
+        an 8bpc array, the same shape as the image, that the result is written
+        into
+    workers : int, optional
+        number of threads that the tile LUTs and bands of the image are
+        processed on; the result is identical for any number of workers
+
+    Returns
+    -------
+    numpy.ndarray
+        the equalized image; this is ``out`` if it was provided
+
+    Raises
+    ------
+    ValueError
+        if the image isn't greyscale, if there are more tiles than pixels
+        along either axis, if the clip limit isn't positive, if ``workers`` is
+        less than one or if the output array doesn't match the image
+    TypeError
+        if the image isn't the ``numpy.uint8`` data type
+    '''
+    analysis._check_greyscale(img)
+    tile_rows, tile_cols = tiles
+    if not (1 <= tile_rows <= img.shape[0] and 1 <= tile_cols <= img.shape[1]):
+        raise ValueError('Need between one tile and one tile per pixel along each axis.')
+    if clip_limit is not None and clip_limit <= 0:
+        raise ValueError('The clip limit must be positive.')
+    if workers < 1:
+        raise ValueError('Need at least one worker.')
+
+    if out is None:
+        out = np.empty_like(img)
+    elif out.shape != img.shape or out.dtype != np.uint8:
+        raise ValueError('Output array must be 8bpc and the same shape as the image.')
+
+    row_edges = _tile_edges(img.shape[0], tile_rows)
+    col_edges = _tile_edges(img.shape[1], tile_cols)
+    tile_views = [img[row_edges[i]:row_edges[i + 1], col_edges[j]:col_edges[j + 1]]
+                  for i in range(tile_rows) for j in range(tile_cols)]
+
+    if tile_rows == tile_cols == 1:
+        # Nothing to interpolate between, so this is a plain LUT.
+        return point_operators.apply_lut(img, _clipped_lut(img, clip_limit), out=out)
+
+    rows = _interpolation(img.shape[0], row_edges)
+    cols = _interpolation(img.shape[1], col_edges)
+    bands = np.linspace(0, img.shape[0], min(img.shape[0], 4*workers) + 1).astype(np.intp)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        luts = np.stack(list(pool.map(lambda tile: _clipped_lut(tile, clip_limit), tile_views)))
+        luts = luts.reshape(tile_rows, tile_cols, 256).astype(np.float32)
+        # Each band writes a disjoint set of rows of the output.
+        list(pool.map(lambda b: _interpolate(img, out, luts, rows, cols, b[0], b[1]),
+                      zip(bands[:-1], bands[1:])))
+
+    return out
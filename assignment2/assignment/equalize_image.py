@@ -1,7 +1,20 @@
 import argparse
+import pathlib
+import sys
+
 import numpy as np
 from PIL import Image
 
+if __package__:
+    from . import point_operators
+    from .analysis import _bincount
+else:
+    # Run directly as a script, e.g. 'python equalize_image.py', so make the
+    # package importable from the folder above this one.
+    sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+    from assignment import point_operators
+    from assignment.analysis import _bincount
+
 def histogram(image):
     """
     Computes the histogram of an 8-bit image.
@@ -12,16 +25,12 @@ def histogram(image):
     Returns:
         np.ndarray: The histogram of the image.
     """
-    # Convert the image to grayscale and flatten it
+    # Convert the image to grayscale
     image = image.convert('L')
-    pixels = np.array(image).flatten()
+    pixels = np.asarray(image)
 
     # Compute the histogram
-    histogram = np.zeros(256, dtype=np.uint32)
-    for pixel in pixels:
-        histogram[pixel] += 1
-
-    return histogram
+    return _bincount(pixels)
 
 def cdf(cumulative_dist):
     """
@@ -37,12 +46,7 @@ def cdf(cumulative_dist):
     pdf = cumulative_dist / float(cumulative_dist.sum())
 
     # Compute the CDF
-    cdf_array = np.zeros_like(pdf)
-    cdf_array[0] = pdf[0]
-    for i in range(1, 256):
-        cdf_array[i] = cdf_array[i-1] + pdf[i]
-
-    return cdf_array
+    return np.cumsum(pdf)
 
 def equalize(image):
     """
@@ -71,18 +75,23 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('input', help='input image file name')
     parser.add_argument('output', help='output image file name')
+    parser.add_argument('--colour', choices=['grey', 'channels', 'luma'], default='grey',
+                        help='equalize a greyscale copy (default), each colour channel '
+                             'or only the luma of a colour image')
     args = parser.parse_args()
 
     # Load the input image
     image = Image.open(args.input)
 
-    # Convert the image to grayscale if it's color
-    if image.mode != 'L':
+    # Convert the image to grayscale unless the colour is being kept
+    if args.colour == 'grey' and image.mode not in ('L', 'I;16'):
         image = image.convert('L')
+    elif args.colour != 'grey' and image.mode != 'RGB':
+        image = image.convert('RGB')
 
     # Equalize the image
-    equalized = equalize(image)
+    pixels = np.asarray(image)
+    equalized = point_operators.equalize(pixels, luma_only=args.colour == 'luma')
 
     # Save the equalized image
-    equalized.save(args.output)
-
+    Image.fromarray(equalized).save(args.output)
@@ -1,33 +1,189 @@
+import collections
+import hashlib
+import threading
+
 import numpy as np
 
+from . import analysis
+from ._util import row_blocks
+
 
-def apply_lut(img, lut):
+def apply_lut(img, lut, out=None, inplace=False):
     '''Apply a look-up table to an image.
 
     The look-up table can be be used to quickly adjust the intensities within an
     image.  For colour images, the same LUT can be applied equally to each
-    colour channel.
+    colour channel, or a separate LUT can be given for each channel.
 
     Parameters
     ----------
     img : numpy.ndarray
         a ``H x W`` greyscale or ``H x W x C`` colour 8bpc image
-    lut : numpy.ndarray
-        a 256-element, 8-bit array
+    lut : numpy.ndarray or LUT
+        a 256-element, 8-bit array, or a ``C x 256`` array with one LUT per
+        colour channel
+    out : numpy.ndarray, optional
+        an 8bpc array, the same shape as the image, that the result is written
+        into
+    inplace : bool, optional
+        if ``True``, overwrite the input image with the result
 
     Returns
     -------
     numpy.ndarray
-        a new ``H x W`` or ``H x W x C`` image derived from applying the LUT
+        a new ``H x W`` or ``H x W x C`` image derived from applying the LUT;
+        this is ``out`` or ``img`` when writing into an existing array
 
     Raises
     ------
     ValueError
-        if the LUT is not 256-elements long
+        if the LUT is not 256-elements long, if a per-channel LUT doesn't match
+        the number of channels or if the output array doesn't match the image
     TypeError
         if either the LUT or images are not 8bpc
     '''
-    raise NotImplementedError('Implement this function/method.')
+    lut = np.asarray(lut) if isinstance(lut, LUT) else lut
+    if img.dtype != np.uint8 or lut.dtype != np.uint8:
+        raise TypeError('Both the image and LUT must be 8bpc.')
+    if lut.ndim not in (1, 2) or lut.shape[-1] != 256:
+        raise ValueError('LUT must be 256-elements long.')
+    if lut.ndim == 2 and (img.ndim != 3 or img.shape[2] != lut.shape[0]):
+        raise ValueError('Need one LUT for each colour channel.')
+
+    if inplace:
+        if out is not None:
+            raise ValueError('Cannot provide an output array when working in-place.')
+        out = img
+    elif out is None:
+        out = np.empty_like(img)
+    elif out.shape != img.shape or out.dtype != np.uint8:
+        raise ValueError('Output array must be 8bpc and the same shape as the image.')
+
+    offsets = None
+    if lut.ndim == 2:
+        # Concatenate the per-channel LUTs and offset each channel's values into
+        # its own LUT, so that every channel is handled by the same gather.
+        offsets = 256*np.arange(lut.shape[0], dtype=np.intp)
+        lut = lut.reshape(-1)
+
+    return _gather(lut, img, out, offsets)
+
+
+def _gather(lut, img, out, offsets=None):
+    '''Write ``lut[img + offsets]`` into ``out`` in blocks of rows.
+
+    The 'clip' mode is a no-op for in-range indices but avoids the output
+    buffering that 'raise' requires.
+    '''
+    for rows in row_blocks(img.shape):
+        block = img[rows]
+        if offsets is not None:
+            block = block + offsets
+        np.take(lut, block, out=out[rows], mode='clip')
+    return out
+
+
+def _equalization_lut(hist, dtype):
+    '''Map each intensity onto its scaled CDF value, as ``equalize_image`` does.'''
+    cdf = np.cumsum(hist / hist.sum())
+    return (np.iinfo(dtype).max * cdf).astype(dtype)
+
+
+def _weighted_sum(block):
+    '''Rec. 601 luma of an RGB block, in thousandths: ``299R + 587G + 114B``.'''
+    total = np.multiply(block[..., 0], 299, dtype=np.uint32)
+    total += np.multiply(block[..., 1], 587, dtype=np.uint32)
+    total += np.multiply(block[..., 2], 114, dtype=np.uint32)
+    return total
+
+
+def _equalize_luma(img, out, levels):
+    '''Equalize the luma of an RGB image, scaling each pixel's channels equally.'''
+    hist = np.zeros(levels, dtype=np.int64)
+    for rows in row_blocks(img.shape):
+        hist += analysis._bincount(_weighted_sum(img[rows]) // 1000, levels)
+
+    maxval = levels - 1
+    lut = _equalization_lut(hist, img.dtype).astype(np.float32)
+    for rows in row_blocks(img.shape):
+        block = img[rows]
+        total = _weighted_sum(block)
+        # The gain is relative to the exact luma so that the output's luma is
+        # the equalized value, rather than being off by the truncated fraction.
+        gain = np.take(lut, total // 1000)
+        gain *= 1000
+        gain /= np.maximum(total, 1)
+        scaled = np.multiply(block, gain[..., np.newaxis], dtype=np.float32)
+        # Black has no hue to preserve, so it becomes the equalized grey level.
+        np.copyto(scaled, lut[0], where=(total == 0)[..., np.newaxis])
+        np.minimum(scaled, maxval, out=scaled)
+        np.copyto(out[rows], scaled, casting='unsafe')
+    return out
+
+
+def equalize(img, out=None, luma_only=False):
+    '''Perform histogram equalization on an image.
+
+    The histogram, CDF and LUT are all computed directly from the array and the
+    LUT is then applied with a single blocked gather, so unlike
+    ``equalize_image.equalize()`` no PIL images are created along the way.  For
+    8bpc greyscale images the two produce identical results.
+
+    Parameters
+    ----------
+    img : numpy.ndarray
+        a ``H x W`` greyscale or ``H x W x C`` colour image, either 8 or 16bpc
+    out : numpy.ndarray, optional
+        an array with the same shape and type as the image that the result is
+        written into; this may be ``img`` itself
+    luma_only : bool, optional
+        if ``True``, equalize the luma of an RGB image and scale the colour
+        channels to match, preserving hue; otherwise each channel is equalized
+        independently
+
+    Returns
+    -------
+    numpy.ndarray
+        the equalized image; this is ``out`` if it was provided
+
+    Raises
+    ------
+    ValueError
+        if the image isn't greyscale or colour, if ``luma_only`` is used on an
+        image that isn't RGB, or if the output array doesn't match the image
+    TypeError
+        if the image isn't 8 or 16bpc
+    '''
+    if img.dtype not in (np.uint8, np.uint16):
+        raise TypeError('Image must be 8 or 16bpc.')
+    if img.ndim not in (2, 3):
+        raise ValueError('Image must be greyscale or colour.')
+    if luma_only and (img.ndim != 3 or img.shape[2] != 3):
+        raise ValueError('Luma-only equalization requires an RGB image.')
+
+    if out is None:
+        out = np.empty_like(img)
+    elif out.shape != img.shape or out.dtype != img.dtype:
+        raise ValueError('Output array must be the same shape and type as the image.')
+
+    levels = np.iinfo(img.dtype).max + 1
+    if img.ndim == 2:
+        lut = _equalization_lut(analysis._bincount(img, levels), img.dtype)
+        return _gather(lut, img, out)
+    if luma_only:
+        return _equalize_luma(img, out, levels)
+
+    # Each channel is counted into, and then gathered from, its own section of
+    # a single histogram and LUT so the image is only traversed twice.
+    channels = img.shape[2]
+    offsets = levels*np.arange(channels, dtype=np.intp)
+    hist = analysis._bincount(img, levels, offsets).reshape(channels, levels)
+    lut = np.concatenate([_equalization_lut(h, img.dtype) for h in hist])
+    return _gather(lut, img, out, offsets)
+
+
+# Every 8-bit intensity, used as the input to the LUT builders.
+_LEVELS = np.arange(256)
 
 
 def adjust_brightness(offset):
@@ -44,7 +200,7 @@ def adjust_brightness(offset):
     numpy.ndarray
         a 256-element LUT that can be provided to ``apply_lut()``
     '''
-    raise NotImplementedError('Implement this function/method.')
+    return np.clip(_LEVELS + offset, 0, 255).astype(np.uint8)
 
 
 def adjust_contrast(scale, hist):
@@ -69,7 +225,10 @@ def adjust_contrast(scale, hist):
     ValueError
         if the histogram is not 256-elements or if the scale is less than zero
     '''
-    raise NotImplementedError('Implement this function/method.')
+    if scale < 0:
+        raise ValueError('Contrast scale must be non-negative.')
+    brightness = analysis.ImageStats(hist).brightness
+    return np.clip(brightness + scale*(_LEVELS - brightness), 0, 255).astype(np.uint8)
 
 
 def adjust_exposure(gamma):
@@ -90,7 +249,9 @@ def adjust_exposure(gamma):
     ValueError
         if ``gamma`` is negative
     '''
-    raise NotImplementedError('Implement this function/method.')
+    if gamma < 0:
+        raise ValueError('Gamma must be non-negative.')
+    return (255*(_LEVELS/255)**gamma).astype(np.uint8)
 
 
 def log_transform():
@@ -101,4 +262,290 @@ def log_transform():
     numpy.ndarray
         a 256-element LUT that can be provided to ``apply_lut()``
     '''
-    raise NotImplementedError('Implement this function/method.')
+    return (255*np.log1p(_LEVELS)/np.log(256)).astype(np.uint8)
+
+
+class LUT:
+    '''A 256-element, 8-bit look-up table that can be composed with others.
+
+    Composition follows function composition: ``(b @ a)(img)`` is the same as
+    ``b(a(img))``, but only needs a single gather over the image.  A ``LUT``
+    can be used anywhere an array is expected, including ``apply_lut()``.
+
+    Attributes
+    ----------
+    table : numpy.ndarray
+        the read-only, 256-element ``numpy.uint8`` table
+    '''
+    def __init__(self, table):
+        '''Initialize the LUT from a table.
+
+        Parameters
+        ----------
+        table : numpy.ndarray
+            a 256-element, 8-bit array, such as those returned by
+            ``adjust_brightness()``; it is copied
+
+        Raises
+        ------
+        TypeError
+            if the table isn't 8bpc
+        ValueError
+            if the table isn't 256-elements long
+        '''
+        table = np.array(table)
+        if table.dtype != np.uint8:
+            raise TypeError('LUT must be 8bpc.')
+        if table.shape != (256,):
+            raise ValueError('LUT must be 256-elements long.')
+        table.setflags(write=False)
+        self.table = table
+
+    @classmethod
+    def identity(cls):
+        '''LUT : a LUT that leaves every intensity unchanged'''
+        return cls(np.arange(256, dtype=np.uint8))
+
+    @property
+    def invertible(self):
+        '''bool : ``True`` if every intensity is mapped onto a different value'''
+        return np.unique(self.table).size == 256
+
+    def inverse(self):
+        '''Get the LUT that undoes this one.
+
+        Returns
+        -------
+        LUT
+            a LUT where ``inverse @ self`` is the identity
+
+        Raises
+        ------
+        ValueError
+            if the LUT maps two intensities onto the same value
+        '''
+        if not self.invertible:
+            raise ValueError('LUT is not invertible.')
+        table = np.empty(256, dtype=np.uint8)
+        table[self.table] = np.arange(256, dtype=np.uint8)
+        return LUT(table)
+
+    def __matmul__(self, other):
+        if not isinstance(other, LUT):
+            return NotImplemented
+        return LUT(self.table[other.table])
+
+    def __call__(self, img, out=None, inplace=False):
+        '''Apply the LUT to an image; see ``apply_lut()``.'''
+        return apply_lut(img, self.table, out=out, inplace=inplace)
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is not None and dtype != np.uint8:
+            return self.table.astype(dtype)
+        return self.table.copy() if copy else self.table
+
+    def __eq__(self, other):
+        if not isinstance(other, LUT):
+            return NotImplemented
+        return np.array_equal(self.table, other.table)
+
+    def __hash__(self):
+        return hash(self.table.tobytes())
+
+    def __repr__(self):
+        return f'LUT({np.array2string(self.table, threshold=8)})'
+
+
+class Pipeline:
+    '''A sequence of point operations that is applied to an image in one pass.
+
+    Each step is either a fixed table, e.g. ``adjust_brightness(50)``, or a
+    function that builds a table from the histogram of the image it's applied
+    to, e.g. ``functools.partial(adjust_contrast, 1.5)``.  The histogram seen
+    by each step is found by remapping the original histogram through the
+    preceding steps, so no intermediate images are created.
+
+    Attributes
+    ----------
+    steps : list
+        the ``LUT`` objects, 256-element arrays or ``hist -> table`` functions,
+        in the order that they are applied
+    '''
+    def __init__(self, steps):
+        self.steps = list(steps)
+
+    @property
+    def needs_histogram(self):
+        '''bool : ``True`` if any step is built from the image histogram'''
+        return any(callable(step) and not isinstance(step, LUT) for step in self.steps)
+
+    def compile(self, hist=None):
+        '''Fold all of the steps into a single LUT.
+
+        Parameters
+        ----------
+        hist : numpy.ndarray, optional
+            the 256-element histogram of the input image; only required if a
+            step is built from the histogram
+
+        Returns
+        -------
+        LUT
+            a LUT that's equivalent to applying every step in turn
+
+        Raises
+        ------
+        ValueError
+            if a step needs the histogram and none was provided
+        '''
+        if self.needs_histogram and hist is None:
+            raise ValueError('The pipeline needs the image histogram to be compiled.')
+
+        lut = LUT.identity()
+        stats = None if hist is None else analysis.ImageStats(hist)
+        for step in self.steps:
+            if callable(step) and not isinstance(step, LUT):
+                step = step(stats.hist)
+            step = step if isinstance(step, LUT) else LUT(step)
+            lut = step @ lut
+            if stats is not None:
+                stats = stats.apply_lut(step.table)
+        return lut
+
+    def apply(self, img, out=None, inplace=False, workers=1):
+        '''Compile the pipeline for an image and apply it with a single gather.
+
+        Parameters
+        ----------
+        img : numpy.ndarray
+            a ``H x W`` greyscale 8bpc image; colour images are supported if no
+            step needs the histogram
+        out : numpy.ndarray, optional
+            see ``apply_lut()``
+        inplace : bool, optional
+            see ``apply_lut()``
+        workers : int, optional
+            number of threads used to compute the histogram, if it's needed
+
+        Returns
+        -------
+        numpy.ndarray
+            the processed image
+        '''
+        hist = analysis.histogram(img, workers) if self.needs_histogram else None
+        return self.compile(hist)(img, out=out, inplace=inplace)
+
+
+class LUTCache:
+    '''A bounded, least-recently-used cache of LUTs built by the LUT functions.
+
+    Interactive clients tend to ask for the same LUT many times over.  Tables
+    are keyed by the function that builds them and its arguments; array
+    arguments, i.e. the histogram given to ``adjust_contrast()``, are keyed by
+    a digest of their contents.  The cached tables are read-only so that one
+    caller can't change the LUT seen by another.
+
+    Attributes
+    ----------
+    maxsize : int
+        the maximum number of LUTs that are kept
+    hits : int
+        number of lookups that were served from the cache
+    misses : int
+        number of lookups that had to build a new LUT
+    '''
+    def __init__(self, maxsize=128):
+        '''Initialize an empty cache.
+
+        Parameters
+        ----------
+        maxsize : int, optional
+            the maximum number of LUTs to keep
+
+        Raises
+        ------
+        ValueError
+            if ``maxsize`` is less than one
+        '''
+        if maxsize < 1:
+            raise ValueError('Cache must hold at least one LUT.')
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._luts = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._luts)
+
+    @staticmethod
+    def _key(func, args):
+        '''Make a hashable key, replacing arrays with a digest of their contents.'''
+        key = [func]
+        for arg in args:
+            if isinstance(arg, np.ndarray):
+                data = np.ascontiguousarray(arg)
+                arg = (data.dtype.str, data.shape,
+                       hashlib.blake2b(data.tobytes(), digest_size=16).digest())
+            key.append(arg)
+        return tuple(key)
+
+    def get(self, func, *args):
+        '''Get the LUT returned by ``func(*args)``, building it only if needed.
+
+        Parameters
+        ----------
+        func : callable
+            a function that returns a LUT, e.g. ``adjust_exposure()``
+        args
+            the arguments passed to ``func``
+
+        Returns
+        -------
+        numpy.ndarray
+            the read-only LUT
+        '''
+        key = self._key(func, args)
+        with self._lock:
+            lut = self._luts.get(key)
+            if lut is not None:
+                self.hits += 1
+                self._luts.move_to_end(key)
+                return lut
+            self.misses += 1
+
+        lut = np.array(func(*args))
+        lut.setflags(write=False)
+        with self._lock:
+            self._luts[key] = lut
+            self._luts.move_to_end(key)
+            while len(self._luts) > self.maxsize:
+                self._luts.popitem(last=False)
+        return lut
+
+    def clear(self):
+        '''Remove every LUT and reset the hit and miss counters.'''
+        with self._lock:
+            self._luts.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def adjust_brightness(self, offset):
+        '''Cached version of ``adjust_brightness()``.'''
+        return self.get(adjust_brightness, offset)
+
+    def adjust_contrast(self, scale, hist):
+        '''Cached version of ``adjust_contrast()``.'''
+        return self.get(adjust_contrast, scale, np.asarray(hist))
+
+    def adjust_exposure(self, gamma):
+        '''Cached version of ``adjust_exposure()``.'''
+        return self.get(adjust_exposure, gamma)
+
+    def log_transform(self):
+        '''Cached version of ``log_transform()``.'''
+        return self.get(log_transform)
+
+
+# A cache shared by callers that don't need their own.
+lut_cache = LUTCache()
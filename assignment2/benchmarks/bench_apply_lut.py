@@ -0,0 +1,56 @@
+'''Benchmark applying a LUT to greyscale and colour images.
+
+The blocked single-gather ``point_operators.apply_lut()`` is compared against
+the original per-channel loop from ``assignment/__init__.py``.  Run it from
+the assignment folder with::
+
+    python -m benchmarks.bench_apply_lut
+'''
+import argparse
+import timeit
+
+import numpy as np
+
+from assignment import point_operators
+
+
+def _channel_loop_apply_lut(image, lut):
+    '''Reference implementation that gathers one colour channel at a time.'''
+    result = np.zeros_like(image)
+    for i in range(3):
+        result[:, :, i] = np.take(lut, image[:, :, i])
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--width', type=int, default=6000, help='image width')
+    parser.add_argument('--height', type=int, default=4000, help='image height')
+    parser.add_argument('--repeats', type=int, default=5, help='timing repetitions')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    colour = rng.integers(0, 256, size=(args.height, args.width, 3), dtype=np.uint8)
+    grey = np.ascontiguousarray(colour[:, :, 0])
+    lut = (np.arange(256) // 2).astype(np.uint8)
+    out = np.empty_like(colour)
+
+    def best(func):
+        return min(timeit.repeat(func, number=1, repeat=args.repeats))
+
+    assert np.array_equal(_channel_loop_apply_lut(colour, lut),
+                          point_operators.apply_lut(colour, lut))
+    timings = {
+        'colour, channel loop': best(lambda: _channel_loop_apply_lut(colour, lut)),
+        'colour, single gather': best(lambda: point_operators.apply_lut(colour, lut)),
+        'colour, out=': best(lambda: point_operators.apply_lut(colour, lut, out=out)),
+        'greyscale': best(lambda: point_operators.apply_lut(grey, lut)),
+    }
+
+    print(f'{args.width}x{args.height} image')
+    for name, seconds in timings.items():
+        print(f'{name:>22} {1e3*seconds:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
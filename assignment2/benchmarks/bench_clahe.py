@@ -0,0 +1,81 @@
+'''Benchmark contrast-limited adaptive histogram equalization.
+
+The vectorised ``clahe.clahe()`` is compared against a naive reference that
+interpolates the tile LUTs one pixel at a time in Python.  Timings are reported
+per megapixel.  Run it from the assignment folder with::
+
+    python -m benchmarks.bench_clahe
+'''
+import argparse
+import timeit
+
+import numpy as np
+
+from assignment import clahe
+
+
+def _naive_clahe(img, tiles, clip_limit):
+    '''Reference implementation that blends the four tile LUTs per pixel.'''
+    row_edges = clahe._tile_edges(img.shape[0], tiles[0])
+    col_edges = clahe._tile_edges(img.shape[1], tiles[1])
+    luts = [[clahe._clipped_lut(img[row_edges[i]:row_edges[i + 1], col_edges[j]:col_edges[j + 1]],
+                                clip_limit)
+             for j in range(tiles[1])] for i in range(tiles[0])]
+    row_centres = (row_edges[:-1] + row_edges[1:] - 1) / 2
+    col_centres = (col_edges[:-1] + col_edges[1:] - 1) / 2
+
+    def neighbours(position, centres):
+        upper = int(np.searchsorted(centres, position, side='right'))
+        lower, upper = max(upper - 1, 0), min(upper, len(centres) - 1)
+        span = centres[upper] - centres[lower]
+        return lower, upper, (position - centres[lower]) / span if span > 0 else 0
+
+    out = np.empty_like(img)
+    for y in range(img.shape[0]):
+        top, bottom, wy = neighbours(y, row_centres)
+        for x in range(img.shape[1]):
+            left, right, wx = neighbours(x, col_centres)
+            v = img[y, x]
+            upper = (1 - wx)*float(luts[top][left][v]) + wx*float(luts[top][right][v])
+            lower = (1 - wx)*float(luts[bottom][left][v]) + wx*float(luts[bottom][right][v])
+            out[y, x] = round((1 - wy)*upper + wy*lower)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--megapixels', type=float, nargs='+', default=[1, 6, 24],
+                        help='image sizes to benchmark')
+    parser.add_argument('--naive-megapixels', type=float, default=0.1,
+                        help='image size used for the (slow) per-pixel reference')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4],
+                        help='thread counts to benchmark')
+    parser.add_argument('--repeats', type=int, default=3, help='timing repetitions')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    def square(megapixels):
+        side = int(np.sqrt(megapixels * 1e6))
+        return rng.integers(0, 256, size=(side, side), dtype=np.uint8)
+
+    def per_megapixel(func, img):
+        seconds = min(timeit.repeat(lambda: func(img), number=1, repeat=args.repeats))
+        return 1e3 * seconds / (img.size / 1e6)
+
+    img = square(args.naive_megapixels)
+    naive = _naive_clahe(img, (8, 8), 2.0)
+    error = np.abs(naive.astype(int) - clahe.clahe(img)).max()
+    seconds = min(timeit.repeat(lambda: _naive_clahe(img, (8, 8), 2.0), number=1, repeat=1))
+    print(f'per-pixel reference ({args.naive_megapixels} MP): '
+          f'{1e3 * seconds / (img.size / 1e6):.1f} ms/MP, max difference {error}')
+
+    print(f'{"MP":>6} ' + ' '.join(f'{f"{n} thread(s)":>12}' for n in args.workers) + '  (ms/MP)')
+    for megapixels in args.megapixels:
+        img = square(megapixels)
+        timings = [per_megapixel(lambda x: clahe.clahe(x, workers=n), img) for n in args.workers]
+        print(f'{megapixels:6.1f} ' + ' '.join(f'{t:12.2f}' for t in timings))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+'''Benchmark histogram equalization.
+
+The NumPy-native ``point_operators.equalize()`` is compared against the
+PIL-based ``equalize_image.equalize()`` (including its array/image
+conversions) and against a plain ``numpy.copyto()`` of the same image, which is
+the memory-bandwidth floor.  Run it from the assignment folder with::
+
+    python -m benchmarks.bench_equalize
+'''
+import argparse
+import timeit
+
+import numpy as np
+from PIL import Image
+
+from assignment import equalize_image, point_operators
+
+
+def _pil_equalize(grey):
+    '''Reference implementation that round-trips through a PIL image.'''
+    return np.asarray(equalize_image.equalize(Image.fromarray(grey)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--width', type=int, default=6000, help='image width')
+    parser.add_argument('--height', type=int, default=4000, help='image height')
+    parser.add_argument('--repeats', type=int, default=3, help='timing repetitions')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    colour = rng.integers(0, 256, size=(args.height, args.width, 3), dtype=np.uint8)
+    grey = np.ascontiguousarray(colour[:, :, 0])
+    wide = rng.integers(0, 1 << 16, size=grey.shape, dtype=np.uint16)
+    out = np.empty_like(grey)
+
+    def best(func):
+        return min(timeit.repeat(func, number=1, repeat=args.repeats))
+
+    assert np.array_equal(_pil_equalize(grey), point_operators.equalize(grey))
+    timings = {
+        'greyscale, copy': best(lambda: np.copyto(out, grey)),
+        'greyscale, PIL': best(lambda: _pil_equalize(grey)),
+        'greyscale': best(lambda: point_operators.equalize(grey)),
+        'greyscale, out=': best(lambda: point_operators.equalize(grey, out=out)),
+        'greyscale, 16bpc': best(lambda: point_operators.equalize(wide)),
+        'colour, per channel': best(lambda: point_operators.equalize(colour)),
+        'colour, luma only': best(lambda: point_operators.equalize(colour, luma_only=True)),
+    }
+
+    print(f'{args.width}x{args.height} image')
+    for name, seconds in timings.items():
+        print(f'{name:>20} {1e3*seconds:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
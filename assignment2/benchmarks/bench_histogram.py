@@ -0,0 +1,55 @@
+'''Benchmark the histogram kernel.
+
+The shared ``analysis`` kernel is compared against ``numpy.histogram()`` (the
+original ``assignment.histogram()``) and the per-pixel Python loop from the
+original ``equalize_image.histogram()``.  Timings are reported per megapixel.
+Run it from the assignment folder with::
+
+    python -m benchmarks.bench_histogram
+'''
+import argparse
+import timeit
+
+import numpy as np
+
+from assignment import analysis
+
+
+def _loop_histogram(pixels):
+    '''Reference implementation that counts one pixel at a time.'''
+    histogram = np.zeros(256, dtype=np.uint32)
+    for pixel in pixels.flatten():
+        histogram[pixel] += 1
+    return histogram
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--megapixels', type=float, nargs='+', default=[1, 6, 24],
+                        help='image sizes to benchmark')
+    parser.add_argument('--loop-megapixels', type=float, default=0.25,
+                        help='image size used for the (slow) per-pixel loop')
+    parser.add_argument('--repeats', type=int, default=3, help='timing repetitions')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    def per_megapixel(func, img):
+        seconds = min(timeit.repeat(lambda: func(img), number=1, repeat=args.repeats))
+        return 1e3 * seconds / (img.size / 1e6)
+
+    img = rng.integers(0, 256, size=int(args.loop_megapixels * 1e6), dtype=np.uint8)
+    print(f'per-pixel loop ({args.loop_megapixels} MP): '
+          f'{per_megapixel(_loop_histogram, img):.1f} ms/MP')
+
+    print(f'{"MP":>6} {"np.histogram":>13} {"kernel":>8}  (ms/MP)')
+    for megapixels in args.megapixels:
+        img = rng.integers(0, 256, size=int(megapixels * 1e6), dtype=np.uint8)
+        assert np.array_equal(np.histogram(img, bins=range(257))[0], analysis._bincount(img))
+        reference = per_megapixel(lambda x: np.histogram(x, bins=range(257)), img)
+        kernel = per_megapixel(analysis._bincount, img)
+        print(f'{megapixels:6.1f} {reference:13.2f} {kernel:8.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+'''Micro-benchmark the LUT builders in ``assignment/__init__.py``.
+
+Each vectorised builder is timed against the per-entry Python loop it
+replaced.  Run it from the assignment folder with::
+
+    python -m benchmarks.bench_lut_builders
+'''
+import argparse
+import timeit
+
+import numpy as np
+
+import assignment
+
+
+def _loop_brightness(lut, factor):
+    for i in range(256):
+        lut[i] = min(max(int(i*factor), 0), 255)
+    return lut
+
+
+def _loop_contrast(lut, factor):
+    for i in range(256):
+        lut[i] = min(max(int(128 + factor*(i-128)), 0), 255)
+    return lut
+
+
+def _loop_exposure(lut, factor):
+    for i in range(256):
+        lut[i] = int(255*(i/255)**factor)
+    return lut
+
+
+def _loop_log(lut):
+    for i in range(256):
+        lut[i] = int(255*np.log(1+i)/np.log(256))
+    return lut
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=1000, help='LUTs built per timing')
+    args = parser.parse_args()
+
+    lut = np.zeros(256, dtype=np.uint8)
+    builders = {
+        'brightness': (_loop_brightness, assignment.adjust_brightness, (1.2,)),
+        'contrast': (_loop_contrast, assignment.adjust_contrast, (1.5,)),
+        'exposure': (_loop_exposure, assignment.adjust_exposure, (2.2,)),
+        'log': (_loop_log, assignment.log_transform, ())
+    }
+
+    print(f'{"LUT":>10} {"loop (us)":>10} {"vector (us)":>12} {"speedup":>8}')
+    for name, (loop, vector, params) in builders.items():
+        assert np.array_equal(loop(lut.copy(), *params), vector(lut.copy(), *params))
+        loop_time = min(timeit.repeat(lambda: loop(lut, *params), number=args.number, repeat=3))
+        vector_time = min(timeit.repeat(lambda: vector(lut, *params), number=args.number,
+                                        repeat=3))
+        loop_time, vector_time = 1e6*loop_time/args.number, 1e6*vector_time/args.number
+        print(f'{name:>10} {loop_time:10.1f} {vector_time:12.1f} {loop_time / vector_time:7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
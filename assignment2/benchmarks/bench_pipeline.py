@@ -0,0 +1,62 @@
+'''Benchmark a chain of point operators.
+
+Applying brightness, contrast, exposure and log LUTs one after the other is
+compared against compiling them into one LUT with ``point_operators.Pipeline``.
+Run it from the assignment folder with::
+
+    python -m benchmarks.bench_pipeline
+'''
+import argparse
+import functools
+import timeit
+
+import numpy as np
+
+from assignment import analysis, point_operators
+
+
+def _chained(img):
+    '''Reference implementation that makes one pass over the image per LUT.'''
+    img = point_operators.apply_lut(img, point_operators.adjust_brightness(-30))
+    lut = point_operators.adjust_contrast(1.5, analysis.histogram(img))
+    img = point_operators.apply_lut(img, lut)
+    img = point_operators.apply_lut(img, point_operators.adjust_exposure(2.2))
+    return point_operators.apply_lut(img, point_operators.log_transform())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--width', type=int, default=6000, help='image width')
+    parser.add_argument('--height', type=int, default=4000, help='image height')
+    parser.add_argument('--repeats', type=int, default=5, help='timing repetitions')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, size=(args.height, args.width), dtype=np.uint8)
+    pipeline = point_operators.Pipeline([
+        point_operators.adjust_brightness(-30),
+        functools.partial(point_operators.adjust_contrast, 1.5),
+        point_operators.adjust_exposure(2.2),
+        point_operators.log_transform()
+    ])
+    hist = analysis.histogram(img)
+    lut = pipeline.compile(hist)
+
+    def best(func):
+        return min(timeit.repeat(func, number=1, repeat=args.repeats))
+
+    assert np.array_equal(_chained(img), pipeline.apply(img))
+    timings = {
+        'four passes': best(lambda: _chained(img)),
+        'pipeline.apply()': best(lambda: pipeline.apply(img)),
+        'compile() only': best(lambda: pipeline.compile(hist)),
+        'compiled LUT': best(lambda: lut(img)),
+    }
+
+    print(f'{args.width}x{args.height} image')
+    for name, seconds in timings.items():
+        print(f'{name:>18} {1e3*seconds:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
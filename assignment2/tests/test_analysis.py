@@ -1,8 +1,10 @@
 import numpy as np
 from numpy.testing import assert_array_equal
+from PIL import Image
 import pytest
 
-from assignment import analysis
+import assignment
+from assignment import analysis, equalize_image
 
 
 def test_q1a_can_generate_histogram():
@@ -22,3 +24,110 @@ def test_q1c_reject_colour_images():
     colour_image = np.ones((10, 10, 3), dtype=np.uint8)
     with pytest.raises(ValueError):
         analysis.histogram(colour_image)
+
+
+def test_q1d_histograms_share_one_kernel():
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, size=(300, 500), dtype=np.uint8)
+    expected, _ = np.histogram(img, bins=range(257))
+
+    assert_array_equal(analysis.histogram(img), expected)
+    assert_array_equal(assignment.histogram(img), expected)
+    assert_array_equal(equalize_image.histogram(Image.fromarray(img)), expected)
+
+    cdf = equalize_image.cdf(expected)
+    assert_array_equal(cdf, np.cumsum(expected / expected.sum()))
+    assert cdf[-1] == pytest.approx(1)
+
+
+def test_q1e_multithreaded_histogram_is_identical():
+    rng = np.random.default_rng(1)
+    img = rng.integers(0, 256, size=(257, 131), dtype=np.uint8)
+    expected = analysis.histogram(img)
+    for workers in [2, 3, 8, 300]:
+        assert_array_equal(analysis.histogram(img, workers=workers), expected)
+
+    with pytest.raises(ValueError):
+        analysis.histogram(img, workers=0)
+
+
+def test_q1f_statistics_reuse_histogram():
+    rng = np.random.default_rng(2)
+    img = rng.integers(0, 256, size=(200, 300), dtype=np.uint8)
+    hist = analysis.histogram(img, workers=4)
+
+    assert analysis.estimate_brightness(img) == int(img.mean())
+    assert analysis.estimate_brightness(img, hist=hist) == int(img.mean())
+    assert analysis.estimate_contrast(img, hist=hist) == analysis.estimate_contrast(img)
+    assert analysis.estimate_contrast(img, workers=4) == analysis.estimate_contrast(img)
+
+
+def test_q1g_image_stats_from_histogram():
+    rng = np.random.default_rng(3)
+    img = rng.normal(100, 30, size=(201, 301)).clip(0, 255).astype(np.uint8)
+    stats = analysis.image_stats(img)
+
+    assert stats.count == img.size
+    assert stats.mean == pytest.approx(img.mean())
+    assert stats.brightness == analysis.estimate_brightness(img)
+    assert stats.std == pytest.approx(img.std())
+    assert stats.minimum == img.min()
+    assert stats.maximum == img.max()
+    assert stats.median == np.median(img)
+    assert stats.contrast(0.9, True) == analysis.estimate_contrast(img, 0.9, True)
+
+    # Remapping the histogram matches processing the image.
+    lut = (255 - np.arange(256) // 3).astype(np.uint8)
+    processed = stats.apply_lut(lut)
+    assert_array_equal(processed.hist, analysis.histogram(lut[img]))
+    assert processed.median == np.median(lut[img])
+
+
+def test_q1h_accumulate_histogram_over_blocks():
+    rng = np.random.default_rng(4)
+    frames = [rng.integers(0, 256, size=(60, 80), dtype=np.uint8) for _ in range(4)]
+
+    # Accumulate the first three frames tile by tile.
+    acc = analysis.HistogramAccumulator()
+    for frame in frames[:3]:
+        for tile in np.array_split(frame, 4):
+            acc.update(tile)
+    window = np.stack(frames[:3])
+    assert_array_equal(acc.hist, analysis.histogram(window.reshape(-1, 80)))
+    assert acc.percentile(0.5) == analysis.image_stats(window.reshape(-1, 80)).median
+
+    # Slide the window forward by one frame.
+    acc.subtract(frames[0]).update(frames[3])
+    window = np.stack(frames[1:]).reshape(-1, 80)
+    assert_array_equal(acc.hist, analysis.histogram(window))
+    assert_array_equal(acc.cdf(), np.cumsum(acc.hist) / window.size)
+    assert acc.stats().contrast() == analysis.estimate_contrast(window)
+
+    other = analysis.HistogramAccumulator().update(frames[0])
+    assert acc.merge(other).count == 4 * frames[0].size
+
+    with pytest.raises(ValueError):
+        analysis.HistogramAccumulator().subtract(frames[0])
+
+
+def test_q1i_empty_images():
+    for shape in ((0, 4), (4, 0)):
+        img = np.zeros(shape, dtype=np.uint8)
+        assert_array_equal(analysis.histogram(img), np.zeros(256))
+        assert_array_equal(analysis.histogram(img, workers=2), np.zeros(256))
+        with pytest.raises(ValueError):
+            analysis.image_stats(img)
+
+
+def test_q1j_contrast_of_mostly_black_image():
+    # The first bin holds more than 1 - percentile of the pixels, so the
+    # lower limit is zero.
+    img = np.zeros((10, 10), dtype=np.uint8)
+    img.flat[:5] = 200
+    assert analysis.estimate_contrast(img, provide_limits=True) == (0, 0)
+    assert analysis.estimate_contrast(img, 0.9, True) == (0, 0)
+    assert analysis.estimate_contrast(img, 0.99, True) == (0, 199)
+
+    # Contrast is unchanged for images where the limits were always found.
+    img = np.arange(100, dtype=np.uint8).reshape(10, 10)
+    assert analysis.estimate_contrast(img, provide_limits=True) == (4, 93)
@@ -0,0 +1,64 @@
+import numpy as np
+from numpy.testing import assert_array_equal
+import pytest
+import skimage.data
+
+from assignment import clahe, point_operators
+
+
+def _naive_clahe(img, tiles, clip_limit):
+    '''Per-pixel reference that interpolates between the tile LUTs explicitly.'''
+    row_edges = clahe._tile_edges(img.shape[0], tiles[0])
+    col_edges = clahe._tile_edges(img.shape[1], tiles[1])
+    luts = [[clahe._clipped_lut(img[row_edges[i]:row_edges[i + 1], col_edges[j]:col_edges[j + 1]],
+                                clip_limit)
+             for j in range(tiles[1])] for i in range(tiles[0])]
+    row_centres = [(row_edges[i] + row_edges[i + 1] - 1) / 2 for i in range(tiles[0])]
+    col_centres = [(col_edges[j] + col_edges[j + 1] - 1) / 2 for j in range(tiles[1])]
+
+    def neighbours(position, centres):
+        upper = sum(c <= position for c in centres)
+        lower, upper = max(upper - 1, 0), min(upper, len(centres) - 1)
+        span = centres[upper] - centres[lower]
+        return lower, upper, (position - centres[lower]) / span if span > 0 else 0
+
+    out = np.empty_like(img)
+    for y in range(img.shape[0]):
+        top, bottom, wy = neighbours(y, row_centres)
+        for x in range(img.shape[1]):
+            left, right, wx = neighbours(x, col_centres)
+            v = img[y, x]
+            upper = (1 - wx)*float(luts[top][left][v]) + wx*float(luts[top][right][v])
+            lower = (1 - wx)*float(luts[bottom][left][v]) + wx*float(luts[bottom][right][v])
+            out[y, x] = round((1 - wy)*upper + wy*lower)
+    return out
+
+
+def test_q5a_clahe_without_tiles_or_clipping_is_equalization():
+    img = skimage.data.camera()
+    assert_array_equal(clahe.clahe(img, tiles=(1, 1), clip_limit=None),
+                       point_operators.equalize(img))
+
+
+def test_q5b_clahe_matches_per_pixel_reference():
+    img = skimage.data.camera()[::8, ::6]
+    expected = _naive_clahe(img, (4, 5), 2.0)
+    out = clahe.clahe(img, tiles=(4, 5), clip_limit=2.0)
+    # The float32 interpolation may round the other way at exact halves.
+    assert np.abs(out.astype(int) - expected).max() <= 1
+
+    for workers in (2, 3):
+        assert_array_equal(clahe.clahe(img, tiles=(4, 5), workers=workers, out=np.empty_like(img)),
+                           out)
+
+
+def test_q5c_clahe_invalid_arguments_raise_error():
+    img = skimage.data.camera()
+    with pytest.raises(TypeError):
+        clahe.clahe(img.astype(np.float32))
+    with pytest.raises(ValueError):
+        clahe.clahe(skimage.data.astronaut())
+    with pytest.raises(ValueError):
+        clahe.clahe(img, tiles=(0, 8))
+    with pytest.raises(ValueError):
+        clahe.clahe(img, clip_limit=0)
@@ -0,0 +1,36 @@
+import numpy as np
+from numpy.testing import assert_array_equal
+
+import assignment
+
+
+def _reference_lut(transform, clip=True):
+    '''Build a LUT one entry at a time, the way the original loops did.'''
+    lut = np.zeros(256, dtype=np.uint8)
+    for i in range(256):
+        value = int(transform(i))
+        if clip:
+            value = min(max(value, 0), 255)
+        lut[i] = value
+    return lut
+
+
+def test_brightness_and_contrast_luts_match_loops():
+    for factor in [-1.0, 0.0, 0.3, 0.5, 1.0, 1.37, 2.0, 10.0]:
+        expected = _reference_lut(lambda i: i*factor)
+        lut = assignment.adjust_brightness(np.zeros(256, dtype=np.uint8), factor)
+        assert_array_equal(lut, expected)
+
+        expected = _reference_lut(lambda i: 128 + factor*(i-128))
+        lut = assignment.adjust_contrast(np.zeros(256, dtype=np.uint8), factor)
+        assert_array_equal(lut, expected)
+
+
+def test_exposure_and_log_luts_match_loops():
+    for factor in [0.1, 0.45, 1.0, 2.2, 5.0]:
+        expected = _reference_lut(lambda i: 255*(i/255)**factor, clip=False)
+        lut = assignment.adjust_exposure(np.zeros(256, dtype=np.uint8), factor)
+        assert_array_equal(lut, expected)
+
+    expected = _reference_lut(lambda i: 255*np.log(1+i)/np.log(256), clip=False)
+    assert_array_equal(assignment.log_transform(np.zeros(256, dtype=np.uint8)), expected)
@@ -1,3 +1,4 @@
+import functools
 import pathlib
 
 import matplotlib.pyplot as plt
@@ -61,15 +62,19 @@ def _compare_stats_after_applying_lut(img, lut, folder):
     img = rgb2gray(img)
     img = img_as_ubyte(img)
 
+    stats = analysis.image_stats(img)
     original_stats = _Stats()
-    original_stats.brightness = analysis.estimate_brightness(img)
-    original_stats.contrast = analysis.estimate_contrast(img)
+    original_stats.brightness = stats.brightness
+    original_stats.contrast = stats.contrast()
 
     processed = point_operators.apply_lut(img, lut)
 
+    # The processed statistics follow from remapping the original histogram.
+    stats = stats.apply_lut(lut)
+    assert_array_equal(stats.hist, analysis.histogram(processed))
     processed_stats = _Stats()
-    processed_stats.brightness = analysis.estimate_brightness(processed)
-    processed_stats.contrast = analysis.estimate_contrast(processed)
+    processed_stats.brightness = stats.brightness
+    processed_stats.contrast = stats.contrast()
 
     imsave(folder / 'original.png', img)
     imsave(folder / 'processed.png', processed)
@@ -183,3 +188,146 @@ def test_q3d_log_transform(tmp_path):
     # Compare against a reference image.
     ref = imread(pathlib.Path() / 'samples' / 'reference' / 'log-transform.png')
     assert_array_equal(out, ref)
+
+
+def test_q2f_apply_lut_into_existing_arrays():
+    plane = np.reshape(np.arange(256, dtype=np.uint8), (16, 16))
+    img = np.dstack((plane, plane, plane))
+    lut = np.arange(256, dtype=np.uint8) // 2
+    expected = np.dstack((plane // 2, plane // 2, plane // 2))
+
+    out = np.zeros_like(img)
+    assert point_operators.apply_lut(img, lut, out=out) is out
+    assert_array_equal(out, expected)
+
+    assert point_operators.apply_lut(img, lut, inplace=True) is img
+    assert_array_equal(img, expected)
+
+    with pytest.raises(ValueError):
+        point_operators.apply_lut(img, lut, out=np.zeros((16, 16), dtype=np.uint8))
+
+
+def test_q2g_apply_per_channel_luts():
+    plane = np.reshape(np.arange(256, dtype=np.uint8), (16, 16))
+    img = np.dstack((plane, plane, plane))
+    lut = np.stack([
+        np.arange(256, dtype=np.uint8),
+        np.arange(256, dtype=np.uint8) // 2,
+        255 - np.arange(256, dtype=np.uint8)
+    ])
+
+    out = point_operators.apply_lut(img, lut)
+    assert_array_equal(out, np.dstack((plane, plane // 2, 255 - plane)))
+
+    with pytest.raises(ValueError):
+        point_operators.apply_lut(plane, lut)
+
+
+def test_q4a_equalize_matches_pil_version():
+    from PIL import Image
+    from assignment import equalize_image
+
+    img = img_as_ubyte(rgb2gray(skimage.data.astronaut()))
+    expected = np.asarray(equalize_image.equalize(Image.fromarray(img)))
+    assert_array_equal(point_operators.equalize(img), expected)
+
+    out = np.empty_like(img)
+    assert point_operators.equalize(img, out=out) is out
+    assert_array_equal(out, expected)
+
+
+def test_q4b_equalize_colour_and_16bit_images():
+    img = skimage.data.astronaut()
+    out = point_operators.equalize(img)
+    for c in range(3):
+        assert_array_equal(out[:, :, c], point_operators.equalize(img[:, :, c]))
+
+    luma = point_operators.equalize(img, luma_only=True)
+    grey = (point_operators._weighted_sum(img) // 1000).astype(np.uint8)
+    expected = point_operators.equalize(grey)
+    unclipped = luma.max(axis=2) < 255
+    error = point_operators._weighted_sum(luma) // 1000 - expected.astype(int)
+    assert np.abs(error[unclipped]).max() <= 1
+
+    wide = np.reshape(np.arange(1 << 16, dtype=np.uint16) // 4, (256, 256))
+    out = point_operators.equalize(wide)
+    assert out.dtype == np.uint16
+    assert out.max() == 65535
+    assert np.all(np.diff(out.reshape(-1).astype(int)) >= 0)
+
+    with pytest.raises(TypeError):
+        point_operators.equalize(img.astype(np.float32))
+    with pytest.raises(ValueError):
+        point_operators.equalize(img[:, :, 0], luma_only=True)
+
+
+def test_q6a_compose_luts():
+    brighten = point_operators.LUT(point_operators.adjust_brightness(20))
+    gamma = point_operators.LUT(point_operators.adjust_exposure(0.5))
+    img = img_as_ubyte(rgb2gray(skimage.data.rocket()))
+
+    assert_array_equal((gamma @ brighten)(img), gamma(brighten(img)))
+    assert point_operators.LUT.identity() @ gamma == gamma
+    assert_array_equal(point_operators.apply_lut(img, brighten), brighten(img))
+
+    invert = point_operators.LUT(255 - np.arange(256, dtype=np.uint8))
+    assert invert.inverse() @ invert == point_operators.LUT.identity()
+    with pytest.raises(ValueError):
+        brighten.inverse()
+    with pytest.raises(ValueError):
+        brighten.table[0] = 1
+
+
+def test_q6b_compile_pipeline_into_one_lut():
+    img = img_as_ubyte(rgb2gray(skimage.data.rocket()))
+    pipeline = point_operators.Pipeline([
+        point_operators.adjust_brightness(-30),
+        functools.partial(point_operators.adjust_contrast, 1.5),
+        point_operators.adjust_exposure(2.2),
+        point_operators.log_transform()
+    ])
+
+    expected = point_operators.apply_lut(img, pipeline.steps[0])
+    hist = analysis.histogram(expected)
+    expected = point_operators.apply_lut(expected, point_operators.adjust_contrast(1.5, hist))
+    expected = point_operators.apply_lut(expected, pipeline.steps[2])
+    expected = point_operators.apply_lut(expected, pipeline.steps[3])
+
+    assert_array_equal(pipeline.apply(img), expected)
+    assert_array_equal(pipeline.compile(analysis.histogram(img))(img), expected)
+    with pytest.raises(ValueError):
+        pipeline.compile()
+
+
+def test_q6c_cache_luts():
+    cache = point_operators.LUTCache(maxsize=2)
+    hist = analysis.histogram(img_as_ubyte(rgb2gray(skimage.data.rocket())))
+
+    lut = cache.adjust_exposure(2.2)
+    assert_array_equal(lut, point_operators.adjust_exposure(2.2))
+    assert cache.adjust_exposure(2.2) is lut
+    assert (cache.hits, cache.misses) == (1, 1)
+    with pytest.raises(ValueError):
+        lut[0] = 1
+
+    # Histograms are keyed by content, not identity.
+    contrast = cache.adjust_contrast(1.5, hist)
+    assert cache.adjust_contrast(1.5, hist.copy()) is contrast
+    assert_array_equal(contrast, point_operators.adjust_contrast(1.5, hist))
+
+    # The least-recently used LUT, the exposure, is evicted.
+    cache.log_transform()
+    assert len(cache) == 2
+    assert cache.adjust_contrast(1.5, hist) is contrast
+    assert cache.adjust_exposure(2.2) is not lut
+    assert (cache.hits, cache.misses) == (3, 4)
+
+    cache.clear()
+    assert len(cache) == 0 and cache.hits == cache.misses == 0
+
+
+def test_q2h_empty_images():
+    lut = np.arange(256, dtype=np.uint8)
+    for shape in ((0, 4), (0, 4, 3), (4, 0)):
+        img = np.zeros(shape, dtype=np.uint8)
+        assert point_operators.apply_lut(img, lut).shape == shape
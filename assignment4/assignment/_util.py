@@ -0,0 +1,47 @@
+import numpy as np
+
+# Number of pixels the blocked kernels process at a time; small enough for
+# their temporaries to stay in cache.
+BLOCK = 1 << 16
+
+
+def row_blocks(shape, start=0, stop=None, pixels=BLOCK):
+    '''Split a range of rows into bands of about ``pixels`` elements each.
+
+    Parameters
+    ----------
+    shape : tuple
+        shape of the array; the first axis is the one that's split
+    start : int, optional
+        first row of the range
+    stop : int, optional
+        end of the range; defaults to the number of rows
+    pixels : int, optional
+        target number of elements in each band
+
+    Yields
+    ------
+    slice
+        the rows of the next band; every band has at least one row
+    '''
+    rows = max(1, pixels // max(1, int(np.prod(shape[1:]))))
+    stop = shape[0] if stop is None else stop
+    for first in range(start, stop, rows):
+        yield slice(first, min(first + rows, stop))
+
+
+def check_float_dtype(dtype):
+    '''Ensure the requested floating-point type is one that's supported.'''
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError('Can only convert to 32 or 64-bit floating point.')
+    return dtype
+
+
+def as_float(img, dtype):
+    '''Convert an image to floating point on [0, 1], copying only if needed.'''
+    if img.dtype.kind == 'u':
+        return np.multiply(img, 1 / np.iinfo(img.dtype).max, dtype=dtype)
+    if img.dtype.kind == 'f':
+        return img.astype(dtype, copy=False)
+    raise ValueError('Image must be unsigned integer or floating point.')
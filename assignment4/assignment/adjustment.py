@@ -1,9 +1,126 @@
-# import numpy as np
+import numpy as np
 from skimage.color import hsv2rgb, rgb2hsv
 from skimage.util import img_as_float
 
+from ._util import as_float, check_float_dtype, row_blocks
 
-def adjust_saturation(img, amount):
+# The RGB to YIQ transform.  Hue is an angle in the IQ plane and saturation is
+# the distance from the Y axis, so both adjustments are linear in RGB.
+_RGB_TO_YIQ = np.array([
+    [0.299, 0.587, 0.114],
+    [0.59590059, -0.27455667, -0.32134392],
+    [0.21153661, -0.52273617, 0.31119955]
+])
+_YIQ_TO_RGB = np.linalg.inv(_RGB_TO_YIQ)
+
+
+def _check_colour(img):
+    '''Ensure that the image is a 3-channel RGB image.'''
+    if img.ndim != 3 or img.shape[2] != 3:
+        raise ValueError('Image must be a 3-channel RGB image.')
+
+
+def _check_amount(amount):
+    '''Ensure that a saturation adjustment is on [-1, 1].'''
+    if not -1 <= amount <= 1:
+        raise ValueError('Saturation adjustment must be on [-1, 1].')
+
+
+def _colour_matrix(hue, saturation):
+    '''Build the RGB transform that rotates hue and scales saturation.
+
+    The hue is rotated in the IQ plane; the rotation is clockwise so that
+    positive angles move red towards green, as they do in HSV.  Saturation
+    blends each pixel with its luma, where a factor of zero gives greyscale.
+    '''
+    angle = np.deg2rad(hue)
+    c, s = np.cos(angle), np.sin(angle)
+    scale = 1 + saturation
+    yiq = np.array([
+        [1, 0, 0],
+        [0, scale*c, scale*s],
+        [0, -scale*s, scale*c]
+    ])
+    return _YIQ_TO_RGB @ yiq @ _RGB_TO_YIQ
+
+
+def _apply_matrix(img, matrix, dtype):
+    '''Apply a 3x3 colour transform in blocks of rows, clipping the result to [0, 1].
+
+    Only the output is allocated at full size; the converted input and the
+    products are block-sized.
+    '''
+    dtype = check_float_dtype(dtype)
+    matrix = matrix.T.astype(dtype)
+    out = np.empty(img.shape, dtype=dtype)
+    for rows in row_blocks(img.shape[:2]):
+        block = as_float(img[rows], dtype)
+        result = out[rows]
+        np.matmul(block, matrix, out=result)
+        np.clip(result, 0, 1, out=result)
+    return out
+
+
+def _adjust_hsv(img, hue, saturation):
+    '''Adjust hue and saturation exactly in HSV; used for compatibility.'''
+    hsv = rgb2hsv(img_as_float(img))
+    if hue != 0:
+        hsv[:, :, 0] += hue / 360
+        hsv[:, :, 0] %= 1
+    if saturation > 0:
+        hsv[:, :, 1] += saturation * (1 - hsv[:, :, 1])
+    elif saturation < 0:
+        hsv[:, :, 1] *= 1 + saturation
+    return hsv2rgb(hsv)
+
+
+def adjust_hue_saturation(img, hue=0, saturation=0, exact=False, dtype=np.float32):
+    '''Adjust an image's hue and saturation together, in a single pass.
+
+    By default, the hue is rotated and the saturation scaled by one fused
+    ``3 x 3`` colour transform, so the image is read once and only the output
+    is allocated.  This closely follows, but doesn't exactly match, HSV: the
+    hue is rotated about the grey axis of YIQ and the saturation is a blend
+    with the luma, so '+1' doubles each pixel's distance from its luma rather
+    than fully saturating it.  With ``exact=True`` the image is instead
+    converted into HSV and back, as ``adjust_hue()`` and ``adjust_saturation()``
+    do by default.
+
+    Parameters
+    ----------
+    img : numpy.ndarray
+        input colour image; it is converted into floating point if not already
+        floating point
+    hue : float, optional
+        an angle, in degrees, representing the amount of hue shift
+    saturation : float, optional
+        value between -1 and 1 that controls the amount of saturation, where
+        '-1' is completely desaturated
+    exact : bool, optional
+        if ``True``, compute the adjustment in HSV
+    dtype : numpy.dtype, optional
+        floating-point type of the fast path's output; ``numpy.float32`` by
+        default, while the HSV path always produces ``numpy.float64``
+
+    Returns
+    -------
+    numpy.ndarray
+        adjusted image (floating-point storage)
+
+    Raises
+    ------
+    ValueError
+        if the input image isn't 3-channel RGB or if the saturation isn't on
+        [-1, 1]
+    '''
+    _check_colour(img)
+    _check_amount(saturation)
+    if exact:
+        return _adjust_hsv(img, hue, saturation)
+    return _apply_matrix(img, _colour_matrix(hue, saturation), dtype)
+
+
+def adjust_saturation(img, amount, exact=True):
     '''Adjust the amount of saturation in an image.
 
     Parameters
@@ -14,6 +131,9 @@ def adjust_saturation(img, amount):
     amount : float
         value between -1 and 1 that controls the amount of saturation, where
         '+1' is maximum saturation and '-1' is completely desaturated
+    exact : bool, optional
+        if ``True`` (the default), adjust the saturation in HSV; if ``False``,
+        use the faster approximation of ``adjust_hue_saturation()``
 
     Returns
     -------
@@ -23,12 +143,12 @@ def adjust_saturation(img, amount):
     Raises
     ------
     ValueError
-        if the input image isn't 3-channel RGB or if 'amount' is on [-1, 1]
+        if the input image isn't 3-channel RGB or if 'amount' isn't on [-1, 1]
     '''
-    raise NotImplementedError('Implement this function/method.')
+    return adjust_hue_saturation(img, saturation=amount, exact=exact)
 
 
-def adjust_hue(img, amount):
+def adjust_hue(img, amount, exact=True):
     '''Adjust an image's hue by shifting it by a set amount of degrees.
 
     Parameters
@@ -38,6 +158,9 @@ def adjust_hue(img, amount):
         floating point
     amount : float
         an angle, in degrees, representing the amount of hue shift
+    exact : bool, optional
+        if ``True`` (the default), shift the hue in HSV; if ``False``, use the
+        faster approximation of ``adjust_hue_saturation()``
 
     Returns
     -------
@@ -49,7 +172,7 @@ def adjust_hue(img, amount):
     ValueError
         if the input image isn't 3-channel RGB
     '''
-    raise NotImplementedError('Implement this function/method.')
+    return adjust_hue_saturation(img, hue=amount, exact=exact)
 
 
 def to_monochrome(img, wr, wg, wb):
@@ -77,4 +200,8 @@ def to_monochrome(img, wr, wg, wb):
     ValueError
         if the input image is not colour or if any of the weights are negative
     '''
-    raise NotImplementedError('Implement this function/method.')
+    _check_colour(img)
+    weights = np.array([wr, wg, wb], dtype=np.float64)
+    if np.any(weights < 0):
+        raise ValueError('Weights must be non-negative.')
+    return np.matmul(img_as_float(img), weights)
@@ -1,6 +1,131 @@
+import concurrent.futures
+
 import numpy as np
-from skimage.transform import rescale, resize
-from skimage.util import img_as_float
+
+from ._util import as_float, check_float_dtype, row_blocks
+
+# The JPEG RGB to YCbCr transform, with chroma centred on zero.  The inverse is
+# computed from it, rather than using rounded coefficients, so that a round trip
+# is as accurate as possible.
+_RGB_TO_YCBCR = np.array([
+    [0.299, 0.587, 0.114],
+    [-0.1687, -0.3313, 0.5],
+    [0.5, -0.4187, -0.0813]
+])
+_YCBCR_TO_RGB = np.linalg.inv(_RGB_TO_YCBCR)
+
+# The same transforms in 16-bit fixed point for the 8-bit integer path.
+_FIXED_SHIFT = 16
+_FIXED_RGB_TO_YCBCR = np.rint(_RGB_TO_YCBCR * (1 << _FIXED_SHIFT)).astype(np.int32)
+_FIXED_YCBCR_TO_RGB = np.rint(_YCBCR_TO_RGB * (1 << _FIXED_SHIFT)).astype(np.int32)
+
+# Constants added before the fixed-point results are shifted down: the 128
+# offset of 8-bit chroma, plus one half so that the shift rounds.
+_HALF = 1 << (_FIXED_SHIFT - 1)
+_FIXED_TO_YCBCR_BIAS = np.array([0, 128, 128]) * (1 << _FIXED_SHIFT) + _HALF
+_FIXED_TO_RGB_BIAS = -128 * _FIXED_YCBCR_TO_RGB[:, 1:].sum(axis=1) + _HALF
+
+
+def _fixed_transform(channels, matrix, bias, out):
+    '''Apply a fixed-point colour transform to 8-bit images, in blocks of rows.
+
+    Each output channel is ``(matrix @ channels + bias) >> 16``, clipped to
+    [0, 255].  Any offsets on the inputs or outputs are folded into ``bias``.
+    '''
+    for rows in row_blocks(out.shape[:2]):
+        block = [c[rows].astype(np.int32) for c in channels]
+        for i, (weights, offset) in enumerate(zip(matrix, bias)):
+            total = block[0] * weights[0]
+            total += block[1] * weights[1]
+            total += block[2] * weights[2]
+            total += offset
+            total >>= _FIXED_SHIFT
+            np.clip(total, 0, 255, out=total)
+            out[rows, :, i] = total
+
+
+def _nearest(length, samples, factor=None):
+    '''Index of the sample covering each of ``length`` output pixels.
+
+    Each sample covers ``factor`` pixels; without a factor, the samples are
+    spread evenly over the pixels.
+    '''
+    if factor is None:
+        return (np.arange(length) * samples) // length
+    return np.arange(length) // factor
+
+
+def _bilinear(length, samples, dtype, factor=None):
+    '''Find the samples on either side of each output pixel and their weights.
+
+    The samples are treated as lying at the centres of the blocks of
+    ``factor`` pixels they cover, so a partial block at the far edge doesn't
+    shift the others; without a factor, the samples are spread evenly over the
+    pixels.  Pixels beyond the outermost centres take the edge sample.
+
+    Returns
+    -------
+    lower, upper : numpy.ndarray
+        indices of the samples before and after each output pixel
+    weight : numpy.ndarray
+        weight of the ``upper`` sample
+    '''
+    scale = samples / length if factor is None else 1 / factor
+    position = (np.arange(length) + 0.5) * scale - 0.5
+    position = np.clip(position, 0, samples - 1)
+    lower = np.floor(position).astype(np.intp)
+    upper = np.minimum(lower + 1, samples - 1)
+    return lower, upper, (position - lower).astype(dtype)
+
+
+def _window(positions, pixels):
+    '''Restrict sample positions to a tile.
+
+    Parameters
+    ----------
+    positions : tuple
+        the ``(lower, upper, weight)`` sample positions along one axis
+    pixels : slice
+        the tile's pixels along that axis
+
+    Returns
+    -------
+    positions : tuple
+        the positions of the tile's pixels, relative to ``samples``
+    samples : slice
+        the samples that the tile needs, including any halo
+    '''
+    lower, upper, weight = (None if p is None else p[pixels] for p in positions)
+    start = lower[0]
+    stop = (lower[-1] if upper is None else upper[-1]) + 1
+    return (lower - start, None if upper is None else upper - start, weight), slice(start, stop)
+
+
+def _check_ycbcr(Y, CbCr):
+    '''Ensure the luma and chroma channels can be converted back into RGB.'''
+    if Y.ndim != 2:
+        raise ValueError('Luma must be a single-channel image.')
+    if CbCr.ndim != 3 or CbCr.shape[2] != 2:
+        raise ValueError('Chroma must be a two-channel image.')
+    if CbCr.shape[0] > Y.shape[0] or CbCr.shape[1] > Y.shape[1]:
+        raise ValueError('Chroma cannot be larger than the luma.')
+
+
+def _combine(Y, CbCr):
+    '''Convert luma and full-resolution chroma into RGB.'''
+    if Y.dtype == np.uint8 and CbCr.dtype == np.uint8:
+        rgb = np.empty(Y.shape + (3,), dtype=np.uint8)
+        _fixed_transform([Y, CbCr[:, :, 0], CbCr[:, :, 1]], _FIXED_YCBCR_TO_RGB,
+                         _FIXED_TO_RGB_BIAS, rgb)
+        return rgb
+
+    # The first column of the inverse is all ones, so the luma is simply
+    # added to the chroma's contribution.
+    dtype = np.result_type(Y.dtype, CbCr.dtype, np.float32)
+    rgb = np.matmul(CbCr.astype(dtype, copy=False), _YCBCR_TO_RGB[:, 1:].T.astype(dtype))
+    rgb += Y[:, :, np.newaxis]
+    np.clip(rgb, 0, 1, out=rgb)
+    return rgb
 
 
 class YCbCrColourSpace:
@@ -9,38 +134,68 @@ class YCbCrColourSpace:
     The class implements the JPEG varient of YCbCr with support for optional
     chroma subsampling.  The subsampling is represented as a positive integer,
     so a subsampling factor of '2' means the dimensions of the chroma channels
-    are half of the luma channel.
+    are half of the luma channel.  A ``(vertical, horizontal)`` pair subsamples
+    the two directions separately, e.g. ``(1, 2)`` is 4:2:2 subsampling.
+
+    Chroma is downsampled by averaging each block of ``sampling`` pixels, which
+    is an exact box filter for integer factors.  It's upsampled either by
+    repeating each chroma sample or by bilinear interpolation between sample
+    centres.
 
     Attributes
     ----------
-    sampling : int
+    sampling : int or ``(int, int)``
         subsampling factor
+    interpolation : str
+        chroma upsampling method, either 'bilinear' or 'nearest'
     '''
-    def __init__(self, sampling=1):
+    def __init__(self, sampling=1, interpolation='bilinear'):
         '''Initialize the YCbCr to RGB converter.
 
         Parameters
         ----------
-        sampling : int, optional
-            the YCbCr chroma subsampling factor; defaults to '1' or no
-            subsampling
+        sampling : int or ``(int, int)``, optional
+            the YCbCr chroma subsampling factor, or separate vertical and
+            horizontal factors; defaults to '1' or no subsampling
+        interpolation : str, optional
+            'bilinear' (the default) to interpolate the chroma when upsampling
+            it, or 'nearest' to repeat each chroma sample
 
         Raises
         ------
         ValueError
-            if the sampling factor is less than '1'
+            if the sampling factor is less than '1' or not a whole number, or
+            if the interpolation method is unknown
         '''
-        if sampling < 1:
+        factors = tuple(np.broadcast_to(sampling, (2,)))
+        if any(f < 1 for f in factors):
             raise ValueError('Sampling factor must be larger than "1".')
+        if any(int(f) != f for f in factors):
+            raise ValueError('Sampling factor must be a whole number.')
+        if interpolation not in ('bilinear', 'nearest'):
+            raise ValueError('Interpolation must be "bilinear" or "nearest".')
         self.sampling = sampling
+        self.interpolation = interpolation
+        self._factors = tuple(int(f) for f in factors)
 
-    def to_ycbcr(self, img):
+    def to_ycbcr(self, img, dtype=np.float64):
         '''Convert the input RGB image into YCbCr.
 
+        The conversion is a single ``N x 3`` by ``3 x 3`` matrix multiply.  The
+        luma and chroma that are returned are views into the one array that it
+        produces, so nothing else is copied.
+
+        With ``dtype=numpy.uint8`` the 8-bit, JPEG-range variant is computed
+        directly with integer arithmetic instead: the image must be 8bpc, the
+        luma is on [0, 255] and the chroma is offset by 128.
+
         Parameters
         ----------
         img : numpy.ndarray
             input RGB image
+        dtype : numpy.dtype, optional
+            type of the output; ``numpy.float32`` halves the memory used
+            compared with the default ``numpy.float64``
 
         Returns
         -------
@@ -53,9 +208,28 @@ class YCbCrColourSpace:
         Raises
         ------
         ValueError
-            if the image isn't a 3-channel colour image
+            if the image isn't a 3-channel colour image, or if it isn't 8bpc
+            for the integer variant
         '''
-        raise NotImplementedError('Implement this function/method.')
+        if img.ndim != 3 or img.shape[2] != 3:
+            raise ValueError('Image must be a 3-channel RGB image.')
+
+        if np.dtype(dtype) == np.uint8:
+            if img.dtype != np.uint8:
+                raise ValueError('The 8-bit conversion requires an 8bpc image.')
+            ycbcr = np.empty(img.shape, dtype=np.uint8)
+            _fixed_transform([img[:, :, i] for i in range(3)], _FIXED_RGB_TO_YCBCR,
+                             _FIXED_TO_YCBCR_BIAS, ycbcr)
+        else:
+            dtype = check_float_dtype(dtype)
+            rgb = as_float(img, dtype).reshape(-1, 3)
+            ycbcr = np.matmul(rgb, _RGB_TO_YCBCR.T.astype(dtype)).reshape(img.shape)
+
+        Y = ycbcr[:, :, 0]
+        CbCr = ycbcr[:, :, 1:]
+        if self._factors != (1, 1):
+            CbCr = self._downsample(CbCr)
+        return Y, CbCr
 
     def to_rgb(self, Y, CbCr):
         '''Convert the input YCbCr image into RGB.
@@ -64,6 +238,11 @@ class YCbCrColourSpace:
         height as the luma channel before the YCbCr to RGB conversion.  They may
         not be larger than the luma channel.
 
+        8-bit luma and chroma are taken to be the JPEG-range values produced by
+        ``to_ycbcr(img, dtype=numpy.uint8)`` and are converted back into an 8bpc
+        image with integer arithmetic.  Otherwise, the result has the same
+        floating-point type as the inputs and is clipped to [0, 1].
+
         Parameters
         ----------
         Y : numpy.ndarray
@@ -82,26 +261,242 @@ class YCbCrColourSpace:
             if ``Y`` isn't a single-channel image or if ``uv`` isn't a
             two-channel image and smalelr than ``Y``
         '''
-        raise NotImplementedError('Implement this function/method.')
+        _check_ycbcr(Y, CbCr)
+        if CbCr.shape[:2] != Y.shape:
+            CbCr = self._upsample(CbCr, Y.shape)
+        return _combine(Y, CbCr)
+
+    def to_ycbcr_tiled(self, img, tile=(1024, 1024), workers=1, dtype=np.float64, out=None):
+        '''Convert a large RGB image into YCbCr one tile at a time.
+
+        The tiles are converted on a thread pool and written straight into the
+        output arrays, so the working memory is bounded by the tile size times
+        the number of workers rather than by the image size.  The outputs may
+        be memory-mapped, e.g. with ``numpy.lib.format.open_memmap()``, so
+        that images larger than memory can be converted.
+
+        Tiles are rounded up to a multiple of the sampling factors.  The box
+        filter used for downsampling never reaches outside of its block, so the
+        tiles need no margin and the result is identical to ``to_ycbcr()``.
+
+        Parameters
+        ----------
+        img : numpy.ndarray
+            input RGB image; this may also be memory-mapped
+        tile : ``(int, int)``, optional
+            tile height and width, in pixels
+        workers : int, optional
+            number of threads converting tiles
+        dtype : numpy.dtype, optional
+            see ``to_ycbcr()``
+        out : ``(Y, CbCr)``, optional
+            preallocated luma and chroma arrays, with the shapes and type that
+            ``to_ycbcr()`` would return
+
+        Returns
+        -------
+        Y : numpy.ndarray
+            the luma channel; this is the first output array if provided
+        CbCr : numpy.ndarray
+            the chroma channels; this is the second output array if provided
+
+        Raises
+        ------
+        ValueError
+            if the image isn't a 3-channel colour image, if a tile dimension or
+            ``workers`` is less than one, or if the output arrays don't match
+        '''
+        if img.ndim != 3 or img.shape[2] != 3:
+            raise ValueError('Image must be a 3-channel RGB image.')
+        fy, fx = self._factors
+        chroma_shape = (-(-img.shape[0] // fy), -(-img.shape[1] // fx), 2)
+        dtype = np.dtype(dtype)
+        if out is None:
+            out = (np.empty(img.shape[:2], dtype=dtype), np.empty(chroma_shape, dtype=dtype))
+        Y, CbCr = out
+        if Y.shape != img.shape[:2] or CbCr.shape != chroma_shape or \
+                Y.dtype != dtype or CbCr.dtype != dtype:
+            raise ValueError(f'Outputs must be {img.shape[:2]} and {chroma_shape} {dtype} arrays.')
+
+        def convert(window):
+            rows, cols = window
+            y, cbcr = self.to_ycbcr(img[rows, cols], dtype=dtype)
+            Y[rows, cols] = y
+            CbCr[rows.start // fy:rows.start // fy + cbcr.shape[0],
+                 cols.start // fx:cols.start // fx + cbcr.shape[1]] = cbcr
+
+        self._map_tiles(convert, img.shape[:2], tile, workers)
+        return Y, CbCr
+
+    def to_rgb_tiled(self, Y, CbCr, tile=(1024, 1024), workers=1, out=None):
+        '''Convert a large YCbCr image into RGB one tile at a time.
+
+        This is the inverse of ``to_ycbcr_tiled()``.  Each tile reads the
+        chroma samples it covers plus the margin, or halo, of neighbouring
+        samples that the upsampling interpolates with, so the result is
+        identical to ``to_rgb()`` with no seams between tiles.
+
+        Parameters
+        ----------
+        Y : numpy.ndarray
+            luma channel
+        CbCr : numpy.ndarray
+            chroma channels; possibly subsampled
+        tile : ``(int, int)``, optional
+            tile height and width, in pixels
+        workers : int, optional
+            number of threads converting tiles
+        out : numpy.ndarray, optional
+            a preallocated ``H x W x 3`` output array, with the type that
+            ``to_rgb()`` would return
+
+        Returns
+        -------
+        numpy.ndarray
+            reconstructed RGB image; this is ``out`` if it was provided
+
+        Raises
+        ------
+        ValueError
+            if the inputs are invalid, as for ``to_rgb()``, if a tile dimension
+            or ``workers`` is less than one, or if the output array doesn't
+            match
+        '''
+        _check_ycbcr(Y, CbCr)
+        if Y.dtype == np.uint8 and CbCr.dtype == np.uint8:
+            dtype = np.dtype(np.uint8)
+        else:
+            dtype = np.result_type(Y.dtype, CbCr.dtype, np.float32)
+        if out is None:
+            out = np.empty(Y.shape + (3,), dtype=dtype)
+        elif out.shape != Y.shape + (3,) or out.dtype != dtype:
+            raise ValueError(f'Output must be a {Y.shape + (3,)} {dtype} array.')
+
+        rows = self._positions(Y.shape[0], CbCr.shape[0], CbCr.dtype, self._factors[0])
+        cols = self._positions(Y.shape[1], CbCr.shape[1], CbCr.dtype, self._factors[1])
+
+        def convert(window):
+            y, x = window
+            tile_rows, chroma_rows = _window(rows, y)
+            tile_cols, chroma_cols = _window(cols, x)
+            cbcr = self._interpolate(CbCr[chroma_rows, chroma_cols], tile_rows, tile_cols)
+            out[y, x] = _combine(Y[y, x], cbcr)
+
+        self._map_tiles(convert, Y.shape, tile, workers)
+        return out
+
+    def _map_tiles(self, func, shape, tile, workers):
+        '''Call ``func((rows, cols))`` for every tile of an image on a thread pool.'''
+        if min(tile) < 1:
+            raise ValueError('Tiles must be at least one pixel.')
+        if workers < 1:
+            raise ValueError('Need at least one worker.')
+
+        # Aligning the tiles with the chroma blocks keeps each block in one tile.
+        height, width = (-(-t // f) * f for t, f in zip(tile, self._factors))
+        windows = [(slice(y, min(y + height, shape[0])), slice(x, min(x + width, shape[1])))
+                   for y in range(0, shape[0], height) for x in range(0, shape[1], width)]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            # Consuming the results re-raises any exception from a worker.
+            list(pool.map(func, windows))
 
     def _downsample(self, c):
-        '''Downsample a single-channel image.
+        '''Downsample the chroma channels by averaging blocks of pixels.
+
+        Edge pixels are repeated to fill out any partial blocks along the
+        right and bottom edges.
 
         Parameters
         ----------
         c : numpy.ndarray
-            input image
+            input ``H x W x C`` image
         '''
-        return rescale(c, 1 / self.sampling, mode='edge', anti_aliasing=True)
+        fy, fx = self._factors
+        height = -(-c.shape[0] // fy)
+        width = -(-c.shape[1] // fx)
+        padding = ((0, height*fy - c.shape[0]), (0, width*fx - c.shape[1]), (0, 0))
+        if any(after for _, after in padding):
+            c = np.pad(c, padding, mode='edge')
+
+        # Summing the rows of each block, and then the columns, with whole-array
+        # adds is much faster than a reduction over the strided block axes.
+        dtype = np.uint32 if c.dtype == np.uint8 else c.dtype
+        rows = c.reshape(height, fy, width*fx, c.shape[2])
+        total = rows[:, 0].astype(dtype)
+        for i in range(1, fy):
+            total += rows[:, i]
+        cols = total.reshape(height, width, fx, c.shape[2])
+        total = cols[:, :, 0].copy()
+        for i in range(1, fx):
+            total += cols[:, :, i]
+
+        if c.dtype == np.uint8:
+            total += fy*fx // 2
+            total //= fy*fx
+            return total.astype(np.uint8)
+        total /= fy*fx
+        return total
 
     def _upsample(self, c, outsz):
-        '''Upsample a single-channel image to match a specified output size.
+        '''Upsample the chroma channels to match a specified output size.
 
         Parameters
         ----------
         c : numpy.ndarray
-            input image
+            input ``H x W x C`` image
         outsz : tuple of ``(height, width)``
             the expected output size
         '''
-        return resize(c, outsz, mode='edge', anti_aliasing=True)
+        rows = self._positions(outsz[0], c.shape[0], c.dtype, self._factors[0])
+        cols = self._positions(outsz[1], c.shape[1], c.dtype, self._factors[1])
+        return self._interpolate(c, rows, cols)
+
+    def _positions(self, length, samples, dtype, factor):
+        '''Find the samples that each of ``length`` upsampled pixels are drawn from.
+
+        Chroma from ``_downsample()`` has one sample per ``factor`` pixels,
+        with the last block padded if it's partial, so the samples are placed
+        by the factor.  Chroma of any other size is spread evenly instead.
+
+        Returns
+        -------
+        lower : numpy.ndarray
+            index of the sample at or before each pixel
+        upper : numpy.ndarray or None
+            index of the sample after each pixel; ``None`` when upsampling by
+            repetition
+        weight : numpy.ndarray or None
+            weight of the ``upper`` sample
+        '''
+        if samples != -(-length // factor):
+            factor = None
+        if self.interpolation == 'nearest':
+            return _nearest(length, samples, factor), None, None
+        return _bilinear(length, samples, np.float32 if dtype == np.uint8 else dtype, factor)
+
+    def _interpolate(self, c, rows, cols):
+        '''Upsample an image using the sample positions from ``_positions()``.'''
+        top, bottom, wy = rows
+        left, right, wx = cols
+        if bottom is None:
+            return np.take(np.take(c, top, axis=0), left, axis=1)
+
+        integer = c.dtype == np.uint8
+        c = c.astype(wy.dtype, copy=False)
+
+        # Interpolate between rows and then between columns.
+        rows = np.take(c, top, axis=0)
+        delta = np.take(c, bottom, axis=0)
+        delta -= rows
+        delta *= wy[:, np.newaxis, np.newaxis]
+        rows += delta
+
+        out = np.take(rows, left, axis=1)
+        delta = np.take(rows, right, axis=1)
+        delta -= out
+        delta *= wx[:, np.newaxis]
+        out += delta
+
+        if integer:
+            return np.rint(out, out=out).astype(np.uint8)
+        return out
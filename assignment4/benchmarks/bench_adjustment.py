@@ -0,0 +1,47 @@
+'''Benchmark hue and saturation adjustments.
+
+The fused single-pass kernel in ``adjustment.adjust_hue_saturation()`` is
+compared against the exact HSV path, which converts the whole image into HSV
+and back in 64-bit floating point.  Run it from the assignment folder with::
+
+    python -m benchmarks.bench_adjustment
+'''
+import argparse
+import timeit
+
+import numpy as np
+
+from assignment import adjustment
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--width', type=int, default=3000, help='image width')
+    parser.add_argument('--height', type=int, default=2000, help='image height')
+    parser.add_argument('--repeats', type=int, default=3, help='timing repetitions')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, size=(args.height, args.width, 3), dtype=np.uint8)
+
+    def best(func):
+        return min(timeit.repeat(func, number=1, repeat=args.repeats))
+
+    timings = {
+        'hue, HSV': best(lambda: adjustment.adjust_hue(img, 45)),
+        'hue, fused': best(lambda: adjustment.adjust_hue(img, 45, exact=False)),
+        'saturation, HSV': best(lambda: adjustment.adjust_saturation(img, 0.5)),
+        'saturation, fused': best(lambda: adjustment.adjust_saturation(img, 0.5, exact=False)),
+        'both, HSV': best(lambda: adjustment.adjust_hue_saturation(img, 45, 0.5, exact=True)),
+        'both, fused': best(lambda: adjustment.adjust_hue_saturation(img, 45, 0.5)),
+        'both, fused float64': best(
+            lambda: adjustment.adjust_hue_saturation(img, 45, 0.5, dtype=np.float64)),
+    }
+
+    print(f'{args.width}x{args.height} image')
+    for name, seconds in timings.items():
+        print(f'{name:>20} {1e3*seconds:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
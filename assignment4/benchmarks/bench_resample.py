@@ -0,0 +1,63 @@
+'''Benchmark chroma subsampling.
+
+The integer-factor box filter and repeat/bilinear upsamplers used by
+``YCbCrColourSpace`` are compared against ``skimage.transform.rescale()`` and
+``resize()``, which were used originally.  Run it from the assignment folder
+with::
+
+    python -m benchmarks.bench_resample
+'''
+import argparse
+import timeit
+
+import numpy as np
+from skimage.transform import rescale, resize
+
+from assignment.colour_space import YCbCrColourSpace
+
+
+def _skimage_downsample(c, sampling):
+    '''Reference implementation with an anti-aliased spline resampler.'''
+    return np.dstack([rescale(c[:, :, i], 1 / sampling, mode='edge', anti_aliasing=True)
+                      for i in range(c.shape[2])])
+
+
+def _skimage_upsample(c, outsz):
+    '''Reference implementation with a spline resampler.'''
+    return np.dstack([resize(c[:, :, i], outsz, mode='edge', anti_aliasing=True)
+                      for i in range(c.shape[2])])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--width', type=int, default=3000, help='image width')
+    parser.add_argument('--height', type=int, default=2000, help='image height')
+    parser.add_argument('--sampling', type=int, default=2, help='subsampling factor')
+    parser.add_argument('--repeats', type=int, default=3, help='timing repetitions')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    chroma = rng.random((args.height, args.width, 2)) - 0.5
+    size = (args.height, args.width)
+    bilinear = YCbCrColourSpace(args.sampling)
+    nearest = YCbCrColourSpace(args.sampling, interpolation='nearest')
+    small = bilinear._downsample(chroma)
+
+    def best(func):
+        return min(timeit.repeat(func, number=1, repeat=args.repeats))
+
+    timings = {
+        'downsample, skimage': best(lambda: _skimage_downsample(chroma, args.sampling)),
+        'downsample, box': best(lambda: bilinear._downsample(chroma)),
+        'upsample, skimage': best(lambda: _skimage_upsample(small, size)),
+        'upsample, bilinear': best(lambda: bilinear._upsample(small, size)),
+        'upsample, nearest': best(lambda: nearest._upsample(small, size)),
+    }
+
+    print(f'{args.width}x{args.height} chroma, sampling {args.sampling}')
+    for name, seconds in timings.items():
+        print(f'{name:>20} {1e3*seconds:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
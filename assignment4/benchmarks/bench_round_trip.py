@@ -0,0 +1,148 @@
+'''Benchmark RGB -> YCbCr -> RGB round trips across sizes and sampling factors.
+
+For every image and chroma sampling factor, the encode (``to_ycbcr()``) and
+decode (``to_rgb()``) latency, the throughput, the peak resident memory and
+the round-trip quality (PSNR and maximum error, in 8-bit levels) are
+recorded.  The images are ``samples/rubiks-cube.jpg`` along with synthetic
+noise and gradient images of each size.  Each measurement runs in a fresh
+process so that the peak memory only reflects that measurement.
+
+The results are written as JSON so that they can be compared between runs.
+Run it from the assignment folder with::
+
+    python -m benchmarks.bench_round_trip --output results.json
+'''
+import argparse
+import concurrent.futures
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+
+import numpy as np
+from skimage.io import imread
+
+from assignment.colour_space import YCbCrColourSpace
+
+# The sample photograph, relative to the assignment folder.
+_SAMPLE = 'samples/rubiks-cube.jpg'
+
+
+def _peak_rss():
+    '''Peak resident set size of this process, in bytes.'''
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes while macOS reports bytes.
+    return peak if sys.platform == 'darwin' else 1024 * peak
+
+
+def _synthetic(kind, megapixels):
+    '''Make a synthetic 8bpc RGB image of about the given size.'''
+    height = int(np.sqrt(megapixels * 1e6 * 3 / 4))
+    width = int(megapixels * 1e6 / height)
+    if kind == 'noise':
+        rng = np.random.default_rng(0)
+        return rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+
+    # Smooth colour ramps, which subsample well.
+    y = np.linspace(0, 1, height)[:, np.newaxis]
+    x = np.linspace(0, 1, width)[np.newaxis, :]
+    img = np.stack(np.broadcast_arrays(x, y, (x + y) / 2), axis=-1)
+    return np.rint(255 * img).astype(np.uint8)
+
+
+def _load(image, megapixels):
+    '''Load an image by name; the sample photograph ignores the size.'''
+    return imread(_SAMPLE) if image == 'rubiks-cube' else _synthetic(image, megapixels)
+
+
+def _measure(point):
+    '''Measure a single benchmark point; runs in its own process.'''
+    image, megapixels, sampling, dtype, repeats = point
+    img = _load(image, megapixels)
+    converter = YCbCrColourSpace(sampling)
+    baseline = _peak_rss()
+
+    encode = decode = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        Y, CbCr = converter.to_ycbcr(img, dtype=dtype)
+        encode = min(encode, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        rgb = converter.to_rgb(Y, CbCr)
+        decode = min(decode, time.perf_counter() - start)
+
+    scale = 1 if dtype == 'uint8' else 255
+    error = np.abs(scale * rgb.astype(np.float64) - img)
+    mse = np.mean(error**2)
+    megapixels = img.shape[0] * img.shape[1] / 1e6
+    return {
+        'image': image,
+        'shape': list(img.shape),
+        'megapixels': megapixels,
+        'sampling': sampling,
+        'dtype': dtype,
+        'encode_ms': 1e3 * encode,
+        'decode_ms': 1e3 * decode,
+        'encode_mp_per_s': megapixels / encode,
+        'decode_mp_per_s': megapixels / decode,
+        'peak_rss_mb': _peak_rss() / 2**20,
+        'conversion_rss_mb': (_peak_rss() - baseline) / 2**20,
+        # JSON has no infinity, so a lossless round trip has no PSNR.
+        'psnr_db': None if mse == 0 else float(10 * np.log10(255**2 / mse)),
+        'max_error': float(error.max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--megapixels', type=float, nargs='+', default=[0.25, 1, 4],
+                        help='sizes of the synthetic images')
+    parser.add_argument('--sampling', type=int, nargs='+', default=[1, 2, 3, 4],
+                        help='chroma sampling factors')
+    parser.add_argument('--images', nargs='+', default=['rubiks-cube', 'noise', 'gradient'],
+                        choices=['rubiks-cube', 'noise', 'gradient'], help='images to convert')
+    parser.add_argument('--dtype', default='float64', choices=['float64', 'float32', 'uint8'],
+                        help='YCbCr storage type')
+    parser.add_argument('--repeats', type=int, default=3, help='timing repetitions')
+    parser.add_argument('--output', help='JSON file to write; defaults to standard output')
+    args = parser.parse_args()
+
+    points = []
+    for image in args.images:
+        sizes = [None] if image == 'rubiks-cube' else args.megapixels
+        for megapixels in sizes:
+            for sampling in args.sampling:
+                points.append((image, megapixels, sampling, args.dtype, args.repeats))
+
+    # A new process per point means 'ru_maxrss' isn't inflated by earlier points.
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for point in points:
+        with concurrent.futures.ProcessPoolExecutor(1, mp_context=context) as pool:
+            result = pool.submit(_measure, point).result()
+        results.append(result)
+        psnr = 'lossless' if result['psnr_db'] is None else f'{result["psnr_db"]:.1f} dB'
+        print(f'{result["image"]:>12} {result["megapixels"]:6.2f} MP, sampling '
+              f'{result["sampling"]}: {result["encode_ms"]:8.1f} ms encode, '
+              f'{result["decode_ms"]:8.1f} ms decode, {psnr}',
+              file=sys.stderr)
+
+    report = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'results': results,
+    }
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
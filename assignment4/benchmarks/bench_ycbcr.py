@@ -0,0 +1,73 @@
+'''Benchmark the RGB/YCbCr conversions.
+
+The matrix-multiply conversions in ``YCbCrColourSpace`` are compared against a
+reference that converts the image with ``img_as_float()`` and computes each
+channel as a separate weighted sum in 64-bit floating point.  Run it from the
+assignment folder with::
+
+    python -m benchmarks.bench_ycbcr
+'''
+import argparse
+import timeit
+
+import numpy as np
+from skimage.util import img_as_float
+
+from assignment.colour_space import YCbCrColourSpace
+
+
+def _reference_to_ycbcr(img):
+    '''Reference implementation that works one channel at a time in float64.'''
+    img = img_as_float(img)
+    R, G, B = img[:, :, 0], img[:, :, 1], img[:, :, 2]
+    Y = 0.299*R + 0.587*G + 0.114*B
+    Cb = -0.1687*R - 0.3313*G + 0.5*B
+    Cr = 0.5*R - 0.4187*G - 0.0813*B
+    return Y, np.dstack((Cb, Cr))
+
+
+def _reference_to_rgb(Y, CbCr):
+    '''Reference implementation of the inverse, using the usual JPEG coefficients.'''
+    Cb, Cr = CbCr[:, :, 0], CbCr[:, :, 1]
+    return np.clip(np.dstack((Y + 1.402*Cr, Y - 0.34414*Cb - 0.71414*Cr, Y + 1.772*Cb)), 0, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--width', type=int, default=6000, help='image width')
+    parser.add_argument('--height', type=int, default=4000, help='image height')
+    parser.add_argument('--repeats', type=int, default=3, help='timing repetitions')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, size=(args.height, args.width, 3), dtype=np.uint8)
+    converter = YCbCrColourSpace()
+
+    def best(func):
+        return min(timeit.repeat(func, number=1, repeat=args.repeats))
+
+    encoded = {
+        'float64 reference': _reference_to_ycbcr(img),
+        'float64 matmul': converter.to_ycbcr(img),
+        'float32 matmul': converter.to_ycbcr(img, dtype=np.float32),
+        'uint8 fixed point': converter.to_ycbcr(img, dtype=np.uint8),
+    }
+    timings = {
+        'float64 reference': (best(lambda: _reference_to_ycbcr(img)),
+                              best(lambda: _reference_to_rgb(*encoded['float64 reference']))),
+        'float64 matmul': (best(lambda: converter.to_ycbcr(img)),
+                           best(lambda: converter.to_rgb(*encoded['float64 matmul']))),
+        'float32 matmul': (best(lambda: converter.to_ycbcr(img, dtype=np.float32)),
+                           best(lambda: converter.to_rgb(*encoded['float32 matmul']))),
+        'uint8 fixed point': (best(lambda: converter.to_ycbcr(img, dtype=np.uint8)),
+                              best(lambda: converter.to_rgb(*encoded['uint8 fixed point']))),
+    }
+
+    print(f'{args.width}x{args.height} image')
+    print(f'{"":>18} {"to_ycbcr":>10} {"to_rgb":>10}  (ms)')
+    for name, (encode, decode) in timings.items():
+        print(f'{name:>18} {1e3*encode:10.1f} {1e3*decode:10.1f}')
+
+
+if __name__ == '__main__':
+    main()
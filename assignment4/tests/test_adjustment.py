@@ -3,6 +3,7 @@ from numpy.testing import assert_array_equal
 
 import pytest
 from skimage import data
+from skimage.color import rgb2hsv
 from skimage.io import imsave
 from skimage.util import img_as_float, img_as_ubyte
 
@@ -73,3 +74,49 @@ def test_q5c_negative_weights_throw_errors():
 
     with pytest.raises(ValueError):
         adjustment.to_monochrome(img, 1/3, 1/3, -1/3)
+
+
+def test_q4c_fused_hue_and_saturation():
+    img = data.coffee()
+    rgb = img_as_float(img)
+
+    # No adjustment leaves the image unchanged; a full desaturation is the luma.
+    assert np.abs(adjustment.adjust_hue_saturation(img) - rgb).max() < 1e-6
+    grey = adjustment.adjust_saturation(img, -1, exact=False)
+    assert grey.dtype == np.float32
+    luma = rgb @ np.array([0.299, 0.587, 0.114])
+    for c in range(3):
+        assert np.abs(grey[:, :, c] - luma).max() < 1e-5
+
+    # Rotating red by 120 degrees moves it towards green, as in HSV.
+    red = np.zeros((1, 1, 3))
+    red[0, 0, 0] = 1
+    assert np.argmax(adjustment.adjust_hue(red, 120, exact=False)[0, 0]) == 1
+
+    # Both adjustments in one pass match applying them one after the other,
+    # as long as the intermediate image didn't need clipping.
+    muted = 0.5 + 0.2*(rgb - 0.5)
+    fused = adjustment.adjust_hue_saturation(muted, hue=45, saturation=-0.5)
+    hued = adjustment.adjust_hue(muted, 45, exact=False)
+    separate = adjustment.adjust_saturation(hued, -0.5, exact=False)
+    assert np.abs(fused - separate).max() < 1e-5
+
+    with pytest.raises(ValueError):
+        adjustment.adjust_hue_saturation(img, saturation=2)
+
+    # Images without any columns give empty results.
+    assert adjustment.adjust_hue_saturation(img[:, :0], hue=45).shape == (400, 0, 3)
+
+
+def test_q4d_exact_hsv_adjustment():
+    img = data.coffee()
+    assert np.abs(adjustment.adjust_hue(img, 360) - img_as_float(img)).max() < 1e-12
+    desaturated = adjustment.adjust_saturation(img, -1)
+    assert_array_equal(desaturated[:, :, 0], desaturated[:, :, 1])
+    assert_array_equal(desaturated[:, :, 0], img_as_float(img).max(axis=2))
+
+    # The single adjustments default to HSV, where '+1' is maximum saturation.
+    assert_array_equal(adjustment.adjust_saturation(img, 0.5),
+                       adjustment.adjust_hue_saturation(img, saturation=0.5, exact=True))
+    saturated = rgb2hsv(adjustment.adjust_saturation(img, 1))
+    assert np.abs(saturated[:, :, 1][saturated[:, :, 2] > 0] - 1).max() < 1e-12
@@ -1,5 +1,5 @@
 import numpy as np
-from numpy.testing import assert_allclose
+from numpy.testing import assert_allclose, assert_array_equal
 import pytest
 from pytest import approx
 from skimage import data
@@ -136,3 +136,114 @@ def test_q1f_invalid_ycbcr_format_throws_error():
         Y = np.zeros((3, 3))
         cbcr = np.zeros((3, 3, 3))
         converter.to_rgb(Y, cbcr)
+
+
+def test_q1g_float32_conversion():
+    img = data.astronaut()
+    converter = YCbCrColourSpace()
+
+    y, cbcr = converter.to_ycbcr(img, dtype=np.float32)
+    assert y.dtype == np.float32 and cbcr.dtype == np.float32
+    y64, cbcr64 = converter.to_ycbcr(img)
+    assert_allclose(y, y64, atol=1e-6)
+    assert_allclose(cbcr, cbcr64, atol=1e-6)
+
+    recovered = converter.to_rgb(y, cbcr)
+    assert recovered.dtype == np.float32
+    assert_allclose(recovered, img_as_float(img), atol=1/512)
+
+
+def test_q1h_8bit_jpeg_conversion():
+    img = data.astronaut()
+    converter = YCbCrColourSpace()
+
+    y, cbcr = converter.to_ycbcr(img, dtype=np.uint8)
+    assert y.dtype == np.uint8 and cbcr.dtype == np.uint8
+    y64, cbcr64 = converter.to_ycbcr(img)
+    assert np.abs(y.astype(float) - 255*y64).max() <= 1
+    assert np.abs(cbcr.astype(float) - (255*cbcr64 + 128)).max() <= 1
+
+    recovered = converter.to_rgb(y, cbcr)
+    assert recovered.dtype == np.uint8
+    assert np.abs(recovered.astype(int) - img).max() <= 2
+
+    with pytest.raises(ValueError):
+        converter.to_ycbcr(img_as_float(img), dtype=np.uint8)
+
+    # Images without any columns convert to empty arrays.
+    y, cbcr = converter.to_ycbcr(img[:, :0], dtype=np.uint8)
+    assert y.shape == (512, 0) and cbcr.shape == (512, 0, 2)
+    assert converter.to_rgb(y, cbcr).shape == (512, 0, 3)
+
+
+def test_q1i_integer_factor_resampling():
+    img = data.astronaut()
+
+    converter = YCbCrColourSpace(2, interpolation='nearest')
+    y, cbcr = converter.to_ycbcr(img)
+    _, full = YCbCrColourSpace().to_ycbcr(img)
+    assert_allclose(cbcr, full.reshape(256, 2, 256, 2, 2).mean(axis=(1, 3)), atol=1e-12)
+    assert_allclose(converter._upsample(cbcr, y.shape),
+                    np.repeat(np.repeat(cbcr, 2, axis=0), 2, axis=1))
+
+    # Bilinear upsampling leaves a constant image unchanged.
+    flat = np.full((4, 5, 2), 0.25)
+    assert_allclose(YCbCrColourSpace(2)._upsample(flat, (8, 10)), 0.25)
+
+    # 4:2:2 only subsamples horizontally, and partial blocks are kept.
+    converter = YCbCrColourSpace((1, 2))
+    y, cbcr = converter.to_ycbcr(img[:, :101])
+    assert cbcr.shape == (512, 51, 2)
+    assert_allclose(converter.to_rgb(y, cbcr), img_as_float(img[:, :101]), atol=0.25)
+
+    with pytest.raises(ValueError):
+        YCbCrColourSpace(1.5)
+    with pytest.raises(ValueError):
+        YCbCrColourSpace(2, interpolation='cubic')
+
+
+@pytest.mark.parametrize('sampling,interpolation', [(1, 'bilinear'), (2, 'bilinear'),
+                                                    ((1, 2), 'nearest'), (3, 'bilinear')])
+def test_q1j_tiled_conversion_matches_whole_image(tmp_path, sampling, interpolation):
+    img = data.astronaut()[:301, :257]
+    converter = YCbCrColourSpace(sampling, interpolation=interpolation)
+
+    y, cbcr = converter.to_ycbcr(img)
+    y_tiled, cbcr_tiled = converter.to_ycbcr_tiled(img, tile=(64, 100), workers=3)
+    assert_allclose(y_tiled, y, atol=1e-12)
+    assert_allclose(cbcr_tiled, cbcr, atol=1e-12)
+
+    # The output can be memory-mapped.
+    out = np.lib.format.open_memmap(tmp_path / 'rgb.npy', mode='w+', dtype=np.float64,
+                                    shape=img.shape)
+    rgb = converter.to_rgb_tiled(y, cbcr, tile=(64, 100), workers=3, out=out)
+    assert rgb is out
+    assert_allclose(rgb, converter.to_rgb(y, cbcr), atol=1e-12)
+
+    y, cbcr = converter.to_ycbcr(img, dtype=np.uint8)
+    y_tiled, cbcr_tiled = converter.to_ycbcr_tiled(img, tile=(50, 50), dtype=np.uint8)
+    assert_array_equal(y_tiled, y)
+    assert_array_equal(cbcr_tiled, cbcr)
+    assert_array_equal(converter.to_rgb_tiled(y, cbcr, tile=(50, 50)), converter.to_rgb(y, cbcr))
+
+    with pytest.raises(ValueError):
+        converter.to_ycbcr_tiled(img, tile=(0, 64))
+    with pytest.raises(ValueError):
+        converter.to_rgb_tiled(y, cbcr, out=np.empty(img.shape))
+
+
+def test_q1k_partial_chroma_blocks_stay_aligned():
+    # A horizontal colour ramp is reconstructed exactly between the outermost
+    # chroma samples, whether or not the width is a multiple of the factor.
+    for width in [100, 101]:
+        img = np.zeros((4, width, 3))
+        img[:, :, 0] = 0.25 + np.arange(width) / 200
+        img[:, :, 2] = 0.5
+
+        converter = YCbCrColourSpace((1, 2))
+        y, cbcr = converter.to_ycbcr(img)
+        error = np.abs(converter.to_rgb(y, cbcr) - img).max(axis=(0, 2))
+        assert error[2:-2].max() < 1e-12
+        assert error[-2:].max() <= error[:2].max()
+        assert_array_equal(converter.to_rgb_tiled(y, cbcr, tile=(4, 32)),
+                           converter.to_rgb(y, cbcr))